@@ -1,9 +1,36 @@
+import time
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
-from transformers import pipeline
-from deep_translator import GoogleTranslator
-from gtts import gTTS
-from datetime import datetime
-import plotly.graph_objects as go
+from backends import DEFAULT_BACKEND
+from cascade import DEFAULT_THRESHOLD, Cascade, emotion_analyzer
+from chat_render import ChatView
+from emotion_cache import EmotionCache
+from inference import MicroBatcher
+from mood_analytics import FleetRollup, MoodTracker
+from mood_chart import build_mood_chart
+from metrics import metrics
+from language import LANGUAGES, detect as detect_language_name
+from replies import all_replies, generate_reply
+from service_client import EmotivaClient
+from session_store import SessionStore, SpillDB
+from pipeline import chat_turn_pipeline
+from tts_cache import TTSCache, estimate_duration
+from translation import TranslationService, load_translator
+from warmup import ModelWarmup, StartupProfile
+import atexit
+import os
+import threading
+import uuid
+from collections import deque
+
+# Heavy modules (transformers, torch, gtts, plotly) are only imported where first used
+@st.cache_resource
+def load_startup_profile():
+    return StartupProfile(started=SCRIPT_STARTED)
+
+startup = load_startup_profile()
+startup.mark("imports")
 
 # --------- UI + Styling ---------
 st.set_page_config(page_title="Emotiva", layout="wide")
@@ -195,189 +222,232 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --------- Language Configuration ---------
-LANGUAGES = {
-    'English': {'code': 'en', 'tts': 'en'},
-    'हिन्दी': {'code': 'hi', 'tts': 'hi'},
-    'Hinglish': {'code': 'en', 'tts': 'en'},
-    'தமிழ்': {'code': 'ta', 'tts': 'ta'},
-    'తెలుగు': {'code': 'te', 'tts': 'te'},
-    'বাংলা': {'code': 'bn', 'tts': 'bn'},
-    'मराठी': {'code': 'mr', 'tts': 'mr'}
-}
+startup.mark("page setup")
 
 # --------- Load Models & States ---------
+# Backend: 'pytorch' (fp32), 'int8' (dynamic quantization) or 'onnx' (ONNX Runtime), set via EMOTIVA_BACKEND
+# The model loads and runs one warm-up pass on a background thread while the UI renders
+@st.cache_resource
+def load_model(backend=DEFAULT_BACKEND):
+    return ModelWarmup(backend, profile=startup).start()
+
+# Shared across every session so concurrent messages are classified together
+BATCH_MAX_SIZE = 16
+BATCH_MAX_WAIT_MS = 10
+
+# Long messages are classified as overlapping token windows whose scores are
+# combined with EMOTIVA_CHUNK_COMBINE: 'mean', 'max' or 'length' (length-weighted)
+CHUNK_WINDOW_TOKENS = 256
+CHUNK_OVERLAP_TOKENS = 64
+CHUNK_COMBINE = os.environ.get("EMOTIVA_CHUNK_COMBINE", "mean")
+
+@st.cache_resource
+def load_batcher():
+    return MicroBatcher(classifier, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS,
+                        window_tokens=CHUNK_WINDOW_TOKENS, window_overlap=CHUNK_OVERLAP_TOKENS, combine=CHUNK_COMBINE)
+
+# Set EMOTIVA_SERVICE_URL (e.g. http://127.0.0.1:8765) to classify through a separate
+# service.py replica instead of loading the model in this process
+SERVICE_URL = os.environ.get("EMOTIVA_SERVICE_URL")
+
+@st.cache_resource
+def load_service_client():
+    return EmotivaClient(SERVICE_URL)
+
+if SERVICE_URL:
+    classify_many = load_service_client().classify_many
+else:
+    classifier = load_model()
+    batcher = load_batcher()
+    classify_many = batcher.classify_many
+
+# Cheap first: a lexicon model answers messages it is sure about ("hi", "thanks")
+# and only the rest reach the transformer. A threshold above 1 disables it.
+CASCADE_THRESHOLD = float(os.environ.get("EMOTIVA_CASCADE_THRESHOLD", DEFAULT_THRESHOLD))
+
+@st.cache_resource
+def load_cascade():
+    return Cascade(classify_many, threshold=CASCADE_THRESHOLD)
+
+cascade = load_cascade()
+
+# Repeated short messages ("hi", "refund?") skip the model entirely
+EMOTION_CACHE_SIZE = 10000
+EMOTION_CACHE_TTL = 24 * 3600
+EMOTION_CACHE_PATH = ".emotion_cache.json"
+
+@st.cache_resource
+def load_emotion_cache():
+    cache = EmotionCache(max_entries=EMOTION_CACHE_SIZE, ttl_seconds=EMOTION_CACHE_TTL)
+    cache.load(EMOTION_CACHE_PATH)
+    atexit.register(cache.save, EMOTION_CACHE_PATH)
+    return cache
+
+emotion_cache = load_emotion_cache()
+
+# Recent turns stay in memory per session; older ones spill to a shared SQLite file
+SESSION_DB_PATH = "emotiva_sessions.db"
+SESSION_RING_SIZE = 25
+SESSION_RETENTION_DAYS = 30
+
+@st.cache_resource
+def load_spill_db():
+    return SpillDB(SESSION_DB_PATH, retention_days=SESSION_RETENTION_DAYS)
+
+if "store" not in st.session_state:
+    st.session_state.store = SessionStore(uuid.uuid4().hex, load_spill_db(), ring_size=SESSION_RING_SIZE)
+
+# Mood aggregates are updated per turn; every session also feeds the shared fleet rollup
 @st.cache_resource
-def load_model():
-    return pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", top_k=None)
+def load_fleet_rollup():
+    return FleetRollup(SESSION_DB_PATH, retention_days=SESSION_RETENTION_DAYS)
+
+fleet_rollup = load_fleet_rollup()
 
-classifier = load_model()
+if "mood" not in st.session_state:
+    st.session_state.mood = MoodTracker()
 
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+if "chat_view" not in st.session_state:
+    st.session_state.chat_view = ChatView()
 
 if "selected_language" not in st.session_state:
     st.session_state.selected_language = 'English'
 
-if "mood_history" not in st.session_state:
-    st.session_state.mood_history = []
-
 if "show_mood_popup" not in st.session_state:
     st.session_state.show_mood_popup = False
 
+if "show_debug_panel" not in st.session_state:
+    st.session_state.show_debug_panel = False
+
+if "turn_timings" not in st.session_state:
+    st.session_state.turn_timings = deque(maxlen=SESSION_RING_SIZE)
+
+startup.mark("resources and state")
+
 # --------- Language Detection ---------
+# Local script + n-gram detector, no network round-trip; returns a LANGUAGES name
+@metrics.timed("detect_language")
 def detect_language(text):
-    try:
-        translated = GoogleTranslator(source='auto', target='en').translate(text)
-        return 'hi' if translated != text else 'en'
-    except:
-        return 'en'
+    return detect_language_name(text)
 
 # --------- Emotion Detection ---------
+# Returns (label, scores, tier); tier is 'cache', 'fast' or 'model'
+analyze_emotion = metrics.timed("detect_emotion")(
+    emotion_analyzer(cascade, emotion_cache, on_tier=lambda tier: metrics.inc("emotion_tier", tier=tier))
+)
+
 def detect_emotion(text):
-    result = classifier(text)[0]
-    top = max(result, key=lambda x: x['score'])
-    return top['label'].lower()
-
-# --------- Generate Female Reply ---------
-def generate_reply(user_input, emotion, language):
-    user_input_lower = user_input.lower()
-
-    if any(greet in user_input_lower for greet in ["hi", "hello", "hey", "heyy"]):
-        core = {
-            'English': "Hello dear! How are you doing today? I'm here to help you with anything you need!",
-            'हिन्दी': "नमस्ते प्रिय! आप कैसे हैं? मैं आपकी हर बात में मदत करने के लिए यहाँ हूँ!",
-            'Hinglish': "Hello dear! Aap kaise hain? Main aapki har help karne ke liye yahan hun!",
-            'தமிழ்': "வணக்கம் அன்பே! நீங்கள் எப்படி இருக்கிறீர்கள்? நான் உங்களுக்கு எல்லாவற்றிலும் உதவ இங்கே இருக்கிறேன்!",
-            'తెలుగు': "నమస్కారం ప్రియమైన! మీరు ఎలా ఉన్నారు? నేను మీకు అన్ని విషయాల్లో సహాయం చేయడానికి ఇక్కడ ఉన్నాను!",
-            'বাংলা': "নমস্কার প্রিয়! আপনি কেমন আছেন? আমি আপনার সব কিছুতে সাহায্য করতে এখানে আছি!",
-            'मराठी': "नमस्कार प्रिय! तुम्ही कसे आहात? मी तुमच्या सर्व गोष्टींमध्ये मदत करण्यासाठी इथे आहे!"
-        }
-    elif any(q in user_input_lower for q in ["help", "issue", "problem", "confused", "can't"]):
-        core = {
-            'English': "Oh sweetie, I'm here to help you through this! Please tell me more about what's troubling you, and I'll do my best to assist you!",
-            'हिन्दी': "अरे प्यारे, मैं आपकी हर परेशानी में आपके साथ हूँ! कृपया अपनी समस्या बताएं, मैं पूरी कोशिश करूंगी!",
-            'Hinglish': "Oh sweetie, main aapki har problem mein help karungi! Please batao kya issue hai, main puri koshish karungi!",
-            'தமிழ்': "ஓ அன்பே, இதில் உங்களுக்கு உதவ நான் இங்கே இருக்கிறேன்! உங்களை தொந்தரவு செய்வது என்னவென்று சொல்லுங்கள், நான் முடிந்த உதவி செய்வேன்!",
-            'తెలుగు': "ఓ చెల్లీ, ఈ విषయంలో మీకు సహాయం చేయడానికి నేను ఇక్కడ ఉన్నాను! మిమ్మల్ని ఇబ్బంది పెట్టేది ఏమిటో చెప్పండి, నేను నా వంతు సహాయం చేస్తాను!",
-            'বাংলা': "ওহ সোনা, আমি এখানে আপনার সাহায্য করতে আছি! আপনার কী সমস্যা হচ্ছে তা বলুন, আমি যথাসাধ্য সাহায্য করব!",
-            'मराठी': "अरे प्रिय, मी तुमच्या मदतीसाठी इथे आहे! तुम्हाला काय त्रास होत आहे ते सांगा, मी माझी पूर्ण मदत करेन!"
-        }
-    elif any(q in user_input_lower for q in ["order", "delivery", "refund", "status"]):
-        core = {
-            'English': "Of course honey! I'd be happy to help you with your order. Could you please share more details so I can assist you better?",
-            'हिन्दी': "बिल्कुल प्रिय! मैं आपकी ऑर्डर में खुशी से मदत करूंगी। कृपया और जानकारी दें ताकि मैं बेहतर सहायता कर सकूं!",
-            'Hinglish': "Bilkul honey! Main aapki order mein khushi se help karungi. Please aur details share karo taki main better assist kar sakun!",
-            'தமிழ்': "நிச்சயமாக அன்பே! உங்கள் ஆர்டருக்கு உதவ நான் மகிழ்ச்சியாக இருக்கிறேன். மேலும் விவரங்களைப் பகிர்ந்து கொள்ளுங்கள், நான் சிறப்பாக உதவ முடியும்!",
-            'తెలుగు': "అయ్యో ఖచ్చితంగా! మీ ఆర్డర్‌లో సహాయం చేయడానికి నేను సంతోషిస్తాను. మరింత వివరాలు షేర్ చేయండి, నేను మంచిగా సహాయం చేయగలను!",
-            'বাংলা': "অবশ্যই প্রিয়! আপনার অর্ডারে সাহায্য করতে আমি খুশি হব। আরও বিস্তারিত জানান যাতে আমি আরও ভালো সাহায্য করতে পারি!",
-            'मराठी': "नक्कीच प्रिय! तुमच्या ऑर्डरमध्ये मदत करण्यात मला आनंद होईल। अधिक तपशील द्या जेणेकरून मी चांगली मदत करू शकेन!"
-        }
-    else:
-        core = {
-            'English': "Thank you so much for your message, dear! I'm here and ready to help you with whatever you need! How can I make your day better?",
-            'हिन्दी': "आपके संदेश के लिए बहुत धन्यवाद प्रिय! मैं यहाँ हूँ और आपकी हर जरूरत में मदत करने को तैयार हूँ! आपका दिन कैसे बेहतर बनाऊं?",
-            'Hinglish': "Thank you so much dear! Main yahan hun aur aapki har need mein help karne ko ready hun! Aapka din kaise better banau?",
-            'தமிழ்': "உங்கள் செய்திக்கு மிக்க நன்றி அன்பே! நான் இங்கே இருக்கிறேன், உங்களுக்கு தேவையான எதிலும் உதவ தயார்! உங்கள் நாளை எப்படி சிறப்பாக்கலாம்?",
-            'తెలుగు': "మీ సందేశానికి చాలా ధన్యవాదాలు ప్రియमైన! నేను ఇక్కడ ఉన్నాను, మీకు అవసరమైన దేనిలోనైనా సహాయం చేయడానికి సిద్ధంగా ఉన్నాను! మీ రోజును ఎలా మెరుగుపరచాలి?",
-            'বাংলা': "আপনার বার্তার জন্য অনেক ধন্যবাদ প্রিয়! আমি এখানে আছি এবং আপনার যা প্রয়োজন তাতে সাহায্য করতে প্রস্তুত! আপনার দিনটি কীভাবে আরও ভালো করতে পারি?",
-            'मराठी': "तुमच्या संदेशासाठी खूप धन्यवाद प्रिय! मी इथे आहे आणि तुमची जी गरज असेल त्यामध्ये मदत करण्यासाठी तयार आहे! तुमचा दिवस कसा चांगला करू?"
-        }
-
-    empathy = {
-        'happy': {
-            'English': "I can feel your positive energy radiating through! ",
-            'हिन्दी': "मैं आपकी सकारात्मक ऊर्जा महसूस कर सकती हूँ! ",
-            'Hinglish': "Main aapki positive energy feel kar sakti hun! ",
-            'தமிழ்': "உங்கள் நேர்மறை ஆற்றலை என்னால் உணர முடிகிறது! ",
-            'తెలుగు': "మీ సానుకూల శక్తిని నేను అనుభవించగలను! ",
-            'বাংলা': "আমি আপনার ইতিবাচক শক্তি অনুভব করতে পারছি! ",
-            'मराठी': "मी तुमची सकारात्मक ऊर्जा जाणवू शकते! "
-        },
-        'sad': {
-            'English': "I can sense you're feeling down, sweetheart. I'm here for you. ",
-            'हिन्दी': "मैं महसूस कर सकती हूँ कि आप उदास हैं प्रिय। मैं आपके साथ हूँ। ",
-            'Hinglish': "Main feel kar sakti hun ki aap sad hain dear. Main aapke saath hun. ",
-            'தமிழ்': "நீங்கள் வருத்தமாக உணர்கிறீர்கள் என்பதை என்னால் உணர முடிகிறது அன்பே। நான் உங்களுடன் இருக்கிறேன். ",
-            'తెలుగు': "మీరు దుఃఖంగా ఉన్నారని నేను అర్థం చేసుకోగలను ప్రియమైన. నేను మీతో ఉన్నాను। ",
-            'বাংলা': "আমি বুঝতে পারছি আপনি মন খারাপ অনুভব করছেন প্রিয়। আমি আপনার সাথে আছি। ",
-            'मराठी': "मी समजू शकते की तुम्हाला वाईट वाटत आहे प্রিय়। मी तुमच्या সোबत आहे। "
-        },
-        'angry': {
-            'English': "I can feel your frustration, dear. Let me help you work through this gently. ",
-            'हिन्दी': "मैं आपकी परेशानी समझ सकती हूँ प्रिय। आइए इसे धीरे-धीरे हल करते हैं। ",
-            'Hinglish': "Main aapki frustration samajh sakti hun dear. Chaliye ise gently solve karte hain. ",
-            'தமிழ்': "உங்கள் கோபத்தை என்னால் உணர முடிகிறது அன்பே। இதை மெதுவாக தீர்க்க உதவுகிறேன். ",
-            'తెలుగు': "మీ నిరాశను నేను అర్థం చేసుకోగలను ప్రియమైన. దీన్ని మెల్లగా పరిష్కరించడంలో సహాయం చేస్తాను। ",
-            'বাংলা': "আমি আপনার হতাশা বুঝতে পারছি প্রিয়। আসুন এটি ধীরে ধীরে সমাধান করি। ",
-            'मराठी': "मी तुमची नाराजी समजू शकते প्রিয়। चला याचे हळूवारपणे निराकरण करूया। "
-        },
-        'fear': {
-            'English': "I can sense your worry, honey. Don't be afraid, I'm here to guide you step by step. ",
-            'हिन्दी': "मैं आपकी चिंता समझ सकती हूँ प्रिय। डरिए मत, मैं आपको कदम-कदम पर मार्गदर्शन दूंगी। ",
-            'Hinglish': "Main aapki worry samajh sakti hun honey. Dare mat, main step by step guide karungi. ",
-            'தமிழ்': "உங்கள் கவலையை என்னால் உணர முடிகிறது அன்பே। பயப்பட வேண்டாம், நான் படிப்படியாக வழிகாட்டுகிறேன். ",
-            'తెలుగు': "మీ ఆందోళనను నేను అర్థం చేసుకోగలను ప్రియమైన. భయపడకండి, నేను మిమ్మల్ని దశలవారీగా మార్గనిర్దేశం చేస్తాను। ",
-            'বাংলা': "আমি আপনার চিন্তা বুঝতে পারছি প্রিয়। ভয় পাবেন না, আমি আপনাকে ধাপে ধাপে গাইড করব। ",
-            'मराठी': "मী तुमची चिंता समजू शकते প্রিয়। घाबरू नका, मी तुम्हाला टप्प्या टप्प्याने मार्गदर्शन करेन। "
-        }
-    }
+    return analyze_emotion(text)[0]
+
+# --------- Translation ---------
+# The classifier is English-only, so non-English text (Hinglish included) is
+# translated once per turn and that translation is what gets classified. Set
+# EMOTIVA_TRANSLATOR=local to skip the network and classify the original text.
+TRANSLATOR = os.environ.get("EMOTIVA_TRANSLATOR", "google")
+
+@st.cache_resource
+def load_translation_service():
+    return TranslationService(load_translator(TRANSLATOR))
+
+translation_service = load_translation_service()
+
+@metrics.timed("translate")
+def translate(text, language):
+    # Bounded like the stage itself, so a hung request doesn't hold a pipeline thread
+    return translation_service.to_english(text, language, timeout=STAGE_TIMEOUTS['translation'])
 
-    e_text = empathy.get(emotion, {}).get(language, "")
-    return f"{e_text}{core[language]}"
+# --------- Turn Pipeline ---------
+# Per-stage timeouts in seconds; a stage that times out or fails uses its fallback
+STAGE_TIMEOUTS = {'language': 0.5, 'translation': 1.5, 'emotion': 3.0, 'reply': 0.5}
+
+@st.cache_resource
+def load_turn_pipeline():
+    return chat_turn_pipeline(detect_language, analyze_emotion, metrics.timed("generate_reply")(generate_reply), STAGE_TIMEOUTS,
+                              translate=translate)
+
+turn_pipeline = load_turn_pipeline()
 
 # --------- TTS ---------
-def speak(text, lang='en'):
-    tts = gTTS(text=text, lang=lang)
-    filename = f"response_{datetime.now().timestamp()}.mp3"
-    tts.save(filename)
-    return filename
+TTS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def reply_variants():
+    for reply, language in all_replies():
+        yield reply, LANGUAGES[language]['tts']
+
+@st.cache_resource
+def load_tts_cache():
+    cache = TTSCache(max_bytes=TTS_CACHE_MAX_BYTES)
+    # Warmed per sentence, matching how speak_stream() looks segments up
+    threading.Thread(target=cache.prewarm, args=(list(reply_variants()),), kwargs={'split': True}, daemon=True).start()
+    return cache
+
+tts_cache = load_tts_cache()
+
+# Sentence by sentence: the first segment can play while the rest are synthesized.
+# "speak" is the time until every segment is synthesized (playback not included),
+# "speak_first_audio" the time until the first one can play.
+def speak_stream(text, lang='en'):
+    requested = time.perf_counter()
+    futures = tts_cache.submit_segments(text, lang)
+    pending = [len(futures)]
+    lock = threading.Lock()
+
+    def segment_done(_):
+        with lock:
+            pending[0] -= 1
+            finished = pending[0] == 0
+        if finished:
+            metrics.observe("speak", (time.perf_counter() - requested) * 1000.0)
+
+    for future in futures:
+        future.add_done_callback(segment_done)
+    for index, future in enumerate(futures):
+        audio = future.result()
+        if index == 0:
+            metrics.observe("speak_first_audio", (time.perf_counter() - requested) * 1000.0)
+        yield audio
 
 # --------- Mood Analysis Chart ---------
 def create_mood_chart():
-    if not st.session_state.mood_history:
-        return None
-    
-    mood_data = {
-        'Message': [f"Message {i+1}" for i in range(len(st.session_state.mood_history))],
-        'Emotion': st.session_state.mood_history,
-        'Time': list(range(1, len(st.session_state.mood_history) + 1))
-    }
-    
-    color_map = {
-        'happy': '#4CAF50',
-        'sad': '#2196F3', 
-        'angry': '#F44336',
-        'fear': '#FF9800',
-        'surprise': '#9C27B0',
-        'disgust': '#795548',
-        'joy': '#FFEB3B'
-    }
-    
-    colors = [color_map.get(emotion, '#607D8B') for emotion in mood_data['Emotion']]
-    
-    fig = go.Figure(data=go.Scatter(
-        x=mood_data['Time'],
-        y=mood_data['Emotion'],
-        mode='markers+lines',
-        marker=dict(size=12, color=colors, line=dict(width=2, color='white')),
-        line=dict(width=3, color='rgba(50, 50, 50, 0.8)'),
-        text=mood_data['Message'],
-        hovertemplate='<b>%{text}</b><br>Emotion: %{y}<br><extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title='Customer Mood Journey',
-        xaxis_title='Message Number',
-        yaxis_title='Detected Emotion',
-        height=400,
-        showlegend=False,
-        paper_bgcolor='#2d2d2d',
-        plot_bgcolor='#2d2d2d',
-        font=dict(color='white')
+    return build_mood_chart(st.session_state.mood.series())
+
+def mood_summary():
+    snapshot = st.session_state.mood.snapshot()
+    smoothed = sorted(snapshot['ema'].items(), key=lambda item: item[1], reverse=True)[:3]
+    recent = {label: count for label, count in snapshot['window_counts'].items() if count}
+    return (
+        "Current mood: " + ", ".join(f"{label} {score:.0%}" for label, score in smoothed)
+        + f" · last {sum(recent.values())} messages: "
+        + ", ".join(f"{label} ×{count}" for label, count in sorted(recent.items(), key=lambda item: -item[1]))
     )
-    
-    return fig
+
+# --------- Metrics ---------
+# Prometheus text format on http://127.0.0.1:<EMOTIVA_METRICS_PORT>/metrics
+METRICS_PORT = int(os.environ.get("EMOTIVA_METRICS_PORT", 9108))
+
+@st.cache_resource
+def start_metrics_server():
+    metrics.gauge("emotion_cache_hit_rate", lambda: emotion_cache.stats()['hit_rate'], "Emotion cache hit rate.")
+    metrics.gauge("tts_cache_hit_rate", lambda: tts_cache.stats()['hit_rate'], "TTS cache hit rate.")
+    metrics.gauge("cascade_skip_fraction", lambda: cascade.stats()['skip_fraction'], "Messages answered without the transformer.")
+    metrics.gauge("translation_cache_hit_rate", lambda: translation_service.stats()['hit_rate'], "Translation cache hit rate.")
+    if not SERVICE_URL:
+        metrics.gauge("batch_queue_depth", lambda: batcher.stats()['queue_depth'], "Requests waiting for the classifier.")
+    try:
+        return metrics.serve(METRICS_PORT)
+    except OSError:
+        # Another process on this host already exports on the port
+        return None
+
+start_metrics_server()
+
+def debug_rows():
+    rows = [
+        {'Metric': name, 'p50 ms': round(stats['p50'], 2), 'p95 ms': round(stats['p95'], 2), 'Samples': stats['samples']}
+        for name, stats in metrics.rolling().items()
+    ]
+    rates = [{'Cache': name, 'Hit rate': f"{value:.0%}"} for name, value in metrics.gauges().items() if name.endswith('hit_rate')]
+    return rows, rates
 
 # --------- Main Layout ---------
 col1, col2 = st.columns([1, 2])
@@ -401,12 +471,19 @@ with col1:
     st.markdown("<h1 style='text-align:center; color: white;'>🤖 Emotiva</h1>", unsafe_allow_html=True)
     st.markdown("<h4 style='text-align:center; color: #cccccc;'>Where Every Matter Matters</h4>", unsafe_allow_html=True)
     
-    if st.button("📊 Mood Analysis", use_container_width=True):
-        st.session_state.show_mood_popup = True
+    col_mood, col_debug = st.columns([3, 1])
+    with col_mood:
+        if st.button("📊 Mood Analysis", use_container_width=True):
+            st.session_state.show_mood_popup = True
+    with col_debug:
+        if st.button("🛠️", use_container_width=True, help="Debug metrics"):
+            st.session_state.show_debug_panel = not st.session_state.show_debug_panel
     
     if st.button("🔄 Start New Chat", use_container_width=True):
-        st.session_state.chat_history = []
-        st.session_state.mood_history = []
+        st.session_state.store.clear()
+        st.session_state.chat_view.reset()
+        st.session_state.turn_timings.clear()
+        st.session_state.mood.reset()
         st.session_state.show_mood_popup = False
         st.rerun()
     
@@ -414,6 +491,13 @@ with col1:
 
 # Right Panel - Chat Interface
 with col2:
+    # Model still loading in the background: the page stays usable meanwhile
+    if not SERVICE_URL and not classifier.ready:
+        if classifier.status == "failed":
+            st.error(f"Emotion model failed to load: {classifier.error}")
+        else:
+            st.info("⏳ Model warming up… short messages are still read, others get a neutral tone until it is ready.")
+
     # Language selector
     col_empty, col_lang = st.columns([3, 1])
     with col_lang:
@@ -425,11 +509,12 @@ with col2:
 
     # Show mood analysis popup as modal
     if st.session_state.show_mood_popup:
-        if st.session_state.mood_history:
+        if st.session_state.store.turn_count:
             with st.container():
                 st.markdown("---")
                 st.markdown("### 📊 Customer Mood Analysis")
                 st.plotly_chart(create_mood_chart(), use_container_width=True)
+                st.caption(mood_summary())
                 
                 col_close1, col_close2, col_close3 = st.columns([1, 1, 1])
                 with col_close2:
@@ -441,44 +526,66 @@ with col2:
             st.info("No mood data available yet. Start chatting to see mood analysis!")
             st.session_state.show_mood_popup = False
 
-    # Chat container with better styling
-    chat_html = '<div class="chat-container">'
-    
-    for idx, (role, message, lang) in enumerate(st.session_state.chat_history):
-        if role == "user":
-            chat_html += f'<div class="user-message">{message}</div>'
-        else:
-            chat_html += f'<div class="bot-message">{message}</div>'
-    
-    chat_html += '</div>'
-    
+    # Rolling latencies and cache hit rates for this process
+    if st.session_state.show_debug_panel:
+        with st.expander("🛠️ Debug Metrics", expanded=True):
+            latency_rows, cache_rows = debug_rows()
+            if latency_rows:
+                st.table(latency_rows)
+            if cache_rows:
+                st.table(cache_rows)
+            st.caption(f"This session: {metrics.session_counts(st.session_state.store.session_id)}")
+
+    # Only the most recent messages are rendered; older ones load on demand
+    chat_view = st.session_state.chat_view
+    messages = st.session_state.store.messages
+    hidden = chat_view.hidden_count(messages)
+    if hidden:
+        if st.button(f"⬆️ Load earlier messages ({hidden} hidden)", key="load_earlier"):
+            chat_view.load_earlier()
+            st.rerun()
+
     # Display chat container
+    with metrics.time("chat_render"):
+        chat_html = chat_view.render(messages)
     st.markdown(chat_html, unsafe_allow_html=True)
 
     # Input container (removed the white bar styling)
     user_input = st.chat_input("Type your message here...")
 
     # TTS for latest bot message only (moved to bottom)
-    if st.session_state.chat_history and st.session_state.chat_history[-1][0] == "bot":
-        latest_message = st.session_state.chat_history[-1][1]
+    last_message = st.session_state.store.last_message()
+    if last_message:
+        latest_message = last_message[0]
         if st.button("🔊 Speak", key="latest_tts"):
             tts_lang = LANGUAGES[st.session_state.selected_language]['tts']
-            audio_path = speak(latest_message, tts_lang)
-            st.audio(audio_path, format="audio/mp3")
+            metrics.count_session(st.session_state.store.session_id, "tts")
+            player = st.container()
+            playing_until = 0.0
+            for audio_bytes in speak_stream(latest_message, tts_lang):
+                now = time.perf_counter()
+                if playing_until > now:
+                    # Let the previous segment finish before the next one autoplays
+                    time.sleep(playing_until - now)
+                player.audio(audio_bytes, format="audio/mp3", autoplay=True)
+                playing_until = max(playing_until, time.perf_counter()) + estimate_duration(audio_bytes)
 
     # Handle user input
     if user_input:
-        # Add user message to chat
-        st.session_state.chat_history.append(("user", user_input, ''))
-
-        # Detect emotion and language
-        lang = detect_language(user_input)
-        emotion = detect_emotion(user_input)
-        st.session_state.mood_history.append(emotion)
-        
-        # Generate reply
+        # Detect language and emotion concurrently, then generate the reply
         target_language = st.session_state.selected_language
-        reply = generate_reply(user_input, emotion, target_language)
-        st.session_state.chat_history.append(("bot", reply, target_language))
+        turn = turn_pipeline.run(user_input, target_language=target_language)
+        emotion, scores, tier = turn['emotion']
+        st.session_state.store.append_turn(user_input, turn['reply'], target_language, emotion, scores)
+        st.session_state.mood.update(emotion, scores)
+        fleet_rollup.record(st.session_state.store.session_id, emotion, scores)
+        st.session_state.turn_timings.append(turn['timings_ms'])
+        metrics.observe("turn", turn['timings_ms']['total'])
+        metrics.count_session(st.session_state.store.session_id, "turns")
+        metrics.count_session(st.session_state.store.session_id, f"emotion_{tier}")
+        for stage, reason in turn['fallbacks'].items():
+            metrics.inc("stage_fallbacks", stage=stage, reason=reason.split(':')[0])
         
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+startup.finish()
@@ -0,0 +1,137 @@
+import os
+
+# --------- Inference Backends ---------
+# All backends return a regular transformers text-classification pipeline, so
+# callers get the same list of {'label', 'score'} dicts whichever one is used.
+
+MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+ONNX_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".onnx_model")
+
+BACKENDS = ("pytorch", "int8", "onnx")
+DEFAULT_BACKEND = os.environ.get("EMOTIVA_BACKEND", "pytorch")
+
+# Fixed corpus for comparing a backend against the fp32 baseline
+PARITY_CORPUS = [
+    "hi",
+    "Hello, how are you today?",
+    "Thank you so much, you made my day!",
+    "I am really happy with the quick delivery.",
+    "Where is my order? It has been two weeks.",
+    "This is the third time I am asking for a refund. Unacceptable!",
+    "I'm so angry, the product arrived broken.",
+    "I'm scared my account has been hacked.",
+    "I feel really sad and lonely today.",
+    "Wow, I did not expect that at all!",
+    "That smell was disgusting, I can't use this.",
+    "ok",
+    "Can you check the status of my delivery please?",
+    "I'm confused, the app keeps showing an error.",
+    "Nothing special, just browsing.",
+    "My package is late again and nobody answers my emails, I am losing patience.",
+]
+
+
+def _build_pipeline(model, tokenizer):
+    from transformers import pipeline
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+
+
+def load_pytorch():
+    from transformers import pipeline
+    return pipeline("text-classification", model=MODEL_NAME, top_k=None)
+
+
+def load_int8():
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+    # Dynamic quantization: Linear weights stored as int8, activations quantized on the fly
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return _build_pipeline(quantized, tokenizer)
+
+
+def load_onnx(cache_dir=ONNX_CACHE_DIR):
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as exc:
+        raise ImportError(
+            "The 'onnx' backend needs optimum and onnxruntime: pip install 'optimum[onnxruntime]'"
+        ) from exc
+    from transformers import AutoTokenizer
+
+    if os.path.isdir(cache_dir) and os.listdir(cache_dir):
+        model = ORTModelForSequenceClassification.from_pretrained(cache_dir)
+        tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+    else:
+        # Export once, then reuse the saved graph on later starts
+        model = ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model.save_pretrained(cache_dir)
+        tokenizer.save_pretrained(cache_dir)
+    return _build_pipeline(model, tokenizer)
+
+
+_LOADERS = {
+    "pytorch": load_pytorch,
+    "int8": load_int8,
+    "onnx": load_onnx,
+}
+
+
+def load_classifier(backend=DEFAULT_BACKEND):
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    return _LOADERS[backend]()
+
+
+# --------- Parity Check ---------
+def _scores(classifier, corpus):
+    results = classifier(list(corpus), truncation=True)
+    return [{item["label"].lower(): item["score"] for item in result} for result in results]
+
+
+def parity_check(candidate, baseline, corpus=PARITY_CORPUS):
+    expected = _scores(baseline, corpus)
+    actual = _scores(candidate, corpus)
+
+    agree = 0
+    drifts = []
+    mismatches = []
+    for text, base, cand in zip(corpus, expected, actual):
+        base_top = max(base, key=base.get)
+        cand_top = max(cand, key=cand.get)
+        if base_top == cand_top:
+            agree += 1
+        else:
+            mismatches.append((text, base_top, cand_top))
+        drifts.extend(abs(base[label] - cand.get(label, 0.0)) for label in base)
+
+    return {
+        "samples": len(corpus),
+        "label_agreement": agree / len(corpus) if corpus else 1.0,
+        "max_score_drift": max(drifts) if drifts else 0.0,
+        "mean_score_drift": sum(drifts) / len(drifts) if drifts else 0.0,
+        "mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    names = sys.argv[1:] or [name for name in BACKENDS if name != "pytorch"]
+    reference = load_pytorch()
+    for name in names:
+        try:
+            report = parity_check(load_classifier(name), reference)
+        except ImportError as exc:
+            print(f"{name}: skipped ({exc})")
+            continue
+        print(
+            f"{name}: agreement={report['label_agreement']:.1%} "
+            f"max_drift={report['max_score_drift']:.4f} mean_drift={report['mean_score_drift']:.4f}"
+        )
+        for text, base_top, cand_top in report["mismatches"]:
+            print(f"  {text!r}: {base_top} -> {cand_top}")
@@ -0,0 +1,182 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from backends import BACKENDS, DEFAULT_BACKEND, load_classifier
+from inference import COMBINE_RULES, WINDOW_OVERLAP, WINDOW_TOKENS, Chunker
+from language import LANGUAGES, detect as detect_language_name, language_code
+from replies import generate_reply
+from translation import TRANSLATORS, TranslationService, load_translator
+
+# --------- Headless Transcript Backfill ---------
+# Streams JSONL/CSV records through the same language / translation / emotion /
+# reply logic the UI uses. Records are processed in chunks on a process pool (one model per
+# worker), only a bounded number of chunks is in flight, and results are
+# appended to the output in input order, so memory stays flat and a crashed run
+# resumes by skipping the records already written.
+
+_classifier = None
+_translation = None
+
+
+def _init_worker(backend, threads=None, translator="google", window_tokens=WINDOW_TOKENS, window_overlap=WINDOW_OVERLAP,
+                 combine="mean"):
+    global _classifier, _translation
+    if threads:
+        # Split the cores between workers instead of every worker grabbing all of them
+        import torch
+        torch.set_num_threads(threads)
+    # Long records become overlapping windows; windows are batched by length
+    _classifier = Chunker(load_classifier(backend), window_tokens, window_overlap, combine)
+    _translation = TranslationService(load_translator(translator))
+
+
+def process_chunk(chunk, text_field, reply_language, batch_size):
+    texts = [str(record.get(text_field) or "") for _, record in chunk]
+    languages = [detect_language_name(text) for text in texts]
+    # Submitted together so each language's misses go out as one bulk request
+    pending = [_translation.submit_english(text, language) for text, language in zip(texts, languages)]
+    english, errors = [], []
+    for text, future in zip(texts, pending):
+        # Like the UI stage, a failed translation falls back to the original text
+        # instead of aborting the run (and every --resume after it)
+        try:
+            english.append(future.result())
+            errors.append(None)
+        except Exception as exc:
+            english.append(text)
+            errors.append(f"{exc.__class__.__name__}: {exc}")
+    scores = _classifier(english, batch_size=batch_size, truncation=True) if texts else []
+    rows = []
+    for (index, record), text, language, translation, error, result in zip(chunk, texts, languages, english, errors, scores):
+        top = max(result, key=lambda x: x['score'])
+        emotion = top['label'].lower()
+        rows.append(dict(
+            record,
+            index=index,
+            language=language_code(language),
+            language_name=language,
+            translation=translation,
+            translation_error=error,
+            emotion=emotion,
+            scores={item['label'].lower(): round(item['score'], 6) for item in result},
+            reply=generate_reply(text, emotion, reply_language),
+        ))
+    return rows
+
+
+# --------- Input / Output ---------
+def read_records(path, fmt):
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def completed_records(path):
+    # Count whole lines already written and drop a torn last line from a crash
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as fh:
+        data = fh.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            fh.truncate(end)
+    return data.count(b"\n", 0, end)
+
+
+def chunks(records, size):
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --------- Runner ---------
+def run(args):
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    skip = completed_records(args.output) if args.resume else 0
+    if skip:
+        print(f"Resuming after {skip} records already in {args.output}", file=sys.stderr)
+
+    records = islice(enumerate(read_records(args.input, fmt)), skip, None)
+    work = chunks(records, args.chunk_size)
+    task_args = (args.text_field, args.reply_language, args.batch_size)
+    worker_args = (args.translator, args.window_tokens, args.window_overlap, args.combine)
+
+    done = 0
+    started = last_report = time.perf_counter()
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as out:
+        def write(rows):
+            nonlocal done, last_report
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            done += len(rows)
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                print(f"{done} messages, {done / (now - started):.1f} msg/s", file=sys.stderr)
+                last_report = now
+
+        if args.workers <= 0:
+            _init_worker(args.backend, None, *worker_args)
+            for chunk in work:
+                write(process_chunk(chunk, *task_args))
+        else:
+            max_in_flight = 2 * args.workers
+            threads = max(1, (os.cpu_count() or 1) // args.workers)
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.backend, threads, *worker_args)) as pool:
+                # Futures are written strictly in submission order to keep the output resumable
+                pending = []
+                for chunk in work:
+                    pending.append(pool.submit(process_chunk, chunk, *task_args))
+                    while len(pending) >= max_in_flight:
+                        wait(pending[:1], return_when=FIRST_COMPLETED)
+                        while pending and pending[0].done():
+                            write(pending.pop(0).result())
+                for future in pending:
+                    write(future.result())
+
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Processed {done} messages in {elapsed:.1f}s ({rate:.1f} msg/s)", file=sys.stderr)
+    return done, rate
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score support transcripts offline with the Emotiva pipeline.")
+    parser.add_argument("input", help="JSONL or CSV file, or '-' for JSONL on stdin")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: from file extension)")
+    parser.add_argument("--text-field", default="text", help="field holding the message text")
+    parser.add_argument("--reply-language", default="English", choices=list(LANGUAGES), help="language of generated replies")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=BACKENDS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes, 0 runs in-process")
+    parser.add_argument("--chunk-size", type=int, default=256, help="records per worker task")
+    parser.add_argument("--batch-size", type=int, default=32, help="classifier batch size")
+    parser.add_argument("--translator", default="google", choices=TRANSLATORS, help="how non-English records are translated")
+    parser.add_argument("--window-tokens", type=int, default=WINDOW_TOKENS, help="tokens per window for long records")
+    parser.add_argument("--window-overlap", type=int, default=WINDOW_OVERLAP, help="tokens shared by neighbouring windows")
+    parser.add_argument("--combine", default="mean", choices=COMBINE_RULES, help="how window scores are combined")
+    parser.add_argument("--resume", action="store_true", help="continue after the records already in the output")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between throughput reports")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
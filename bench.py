@@ -0,0 +1,324 @@
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from backends import BACKENDS, DEFAULT_BACKEND, load_classifier
+from cascade import DEFAULT_THRESHOLD, Cascade, LexiconModel, emotion_analyzer
+from emotion_cache import EmotionCache
+from inference import MicroBatcher
+from language import LANGUAGES, detect as detect_language_name
+from mood_analytics import MoodTracker
+from mood_chart import build_mood_chart
+from pipeline import chat_turn_pipeline
+from replies import generate_reply
+from session_store import EMOTION_LABELS
+from translation import LocalTranslator, TranslationService
+from tts_cache import TTSCache, split_sentences
+
+# --------- Chat Turn Benchmarks ---------
+# Runs every stage of a chat turn, and the full turn, over a fixed multilingual
+# corpus. gTTS and Google Translate are replaced by local stand-ins so nothing
+# touches the network; --stub-model also replaces the transformer for fully
+# offline runs.
+#
+#   python bench.py --save baseline.json
+#   python bench.py --compare baseline.json
+
+CORPUS = [
+    ("hi", "English"),
+    ("hello, is anyone there?", "English"),
+    ("thanks", "English"),
+    ("order status?", "English"),
+    ("refund?", "English"),
+    ("Where is my order? It has been two weeks and nobody replies.", "English"),
+    ("I am really happy with the quick delivery, thank you!", "English"),
+    ("This is the third time I am asking for a refund. Unacceptable!", "English"),
+    ("I'm scared my account has been hacked, I can't log in.", "English"),
+    ("The product arrived broken and the box smelled disgusting.", "English"),
+    ("bhai mera refund kab aayega", "Hinglish"),
+    ("mujhe help chahiye, order abhi tak nahi aaya", "Hinglish"),
+    ("kya aap meri problem solve kar sakte ho", "Hinglish"),
+    ("नमस्ते, मेरा ऑर्डर कहाँ है?", "हिन्दी"),
+    ("मुझे अपना पैसा वापस चाहिए, यह बहुत खराब है", "हिन्दी"),
+    ("मैं बहुत परेशान हूँ और मुझे समझ नहीं आ रहा", "हिन्दी"),
+    ("माझे पैसे कधी परत मिळतील?", "मराठी"),
+    ("मला तुमची मदत हवी आहे", "मराठी"),
+    ("வணக்கம், என் ஆர்டர் எங்கே?", "தமிழ்"),
+    ("எனக்கு பணம் திரும்ப வேண்டும்", "தமிழ்"),
+    ("నమస్కారం, నా ఆర్డర్ ఎక్కడ ఉంది?", "తెలుగు"),
+    ("నాకు సహాయం కావాలి", "తెలుగు"),
+    ("আমার অর্ডার কোথায়?", "বাংলা"),
+    ("আমি খুব হতাশ, আমার টাকা ফেরত চাই", "বাংলা"),
+]
+
+
+# --------- Local Stand-ins ---------
+class LocalSynthesizer:
+    # Deterministic fake mp3 payload, roughly sized like a real clip
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+
+    def synthesize(self, text, lang):
+        if self.latency:
+            time.sleep(self.latency)
+        seed = f"{lang}:{text}".encode("utf-8")
+        return b"ID3" + seed * max(1, 4000 // len(seed))
+
+
+class BenchTranslator(LocalTranslator):
+    # Identity translation with a fixed per-request delay, like one bulk network call
+    def __init__(self, latency_ms=0.0):
+        super().__init__()
+        self.latency = latency_ms / 1000.0
+
+    def translate_batch(self, texts, source='auto'):
+        if self.latency:
+            time.sleep(self.latency)
+        return super().translate_batch(texts, source)
+
+
+class StubClassifier:
+    # Deterministic scores derived from a checksum of the text
+    def _scores(self, text):
+        seed = zlib.crc32(text.encode("utf-8"))
+        raw = [((seed >> (4 * i)) & 0xF) + 1 for i in range(len(EMOTION_LABELS))]
+        total = float(sum(raw))
+        return [{'label': label, 'score': value / total} for label, value in zip(EMOTION_LABELS, raw)]
+
+    def __call__(self, inputs, **kwargs):
+        if isinstance(inputs, str):
+            return [self._scores(inputs)]
+        return [self._scores(text) for text in inputs]
+
+
+# --------- Measurement ---------
+def percentiles(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": sum(ordered) / len(ordered),
+        "samples": len(ordered),
+    }
+
+
+def measure(func, inputs, repeat, warmup=3):
+    for item in inputs[:warmup]:
+        func(item)
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            started = time.perf_counter()
+            func(item)
+            samples.append((time.perf_counter() - started) * 1000.0)
+    return percentiles(samples)
+
+
+def throughput(func, inputs, concurrency, total):
+    work = [inputs[i % len(inputs)] for i in range(total)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(func, work))
+    return total / (time.perf_counter() - started)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def top_emotion(result):
+    top = max(result, key=lambda x: x['score'])
+    return top['label'].lower(), result
+
+
+# --------- Runner ---------
+def run(args):
+    classifier = StubClassifier() if args.stub_model else load_classifier(args.backend)
+    batcher = MicroBatcher(classifier, max_batch_size=max(args.batch_sizes), max_wait_ms=args.max_wait_ms)
+    tts_dir = tempfile.TemporaryDirectory(prefix="emotiva-bench-")
+    tts = TTSCache(LocalSynthesizer(args.tts_latency_ms), cache_dir=tts_dir.name)
+    translation = TranslationService(BenchTranslator(args.translate_latency_ms), max_wait_ms=args.max_wait_ms)
+
+    texts = [text for text, _ in CORPUS]
+    turns = [(text, language) for text, language in CORPUS]
+    emotions = [top_emotion(classifier(text)[0])[0] for text in texts]
+    reply_inputs = [(text, emotion, language) for (text, language), emotion in zip(CORPUS, emotions)]
+    speak_inputs = [(generate_reply(*item), LANGUAGES[item[2]]['tts']) for item in reply_inputs]
+    mood_series = [emotions[i % len(emotions)] for i in range(args.mood_length)]
+
+    # Same emotion stack as app.py: cache, then lexicon fast tier, then the
+    # batcher (which splits long messages into windows) in front of the model.
+    # The cold variants keep nothing (max_entries=0), so every call reaches the
+    # cascade and the translator the way a first-time message does.
+    emotion_cache = EmotionCache()
+    cascade = Cascade(batcher.classify_many, threshold=args.threshold)
+    analyze_emotion = emotion_analyzer(cascade, emotion_cache)
+    analyze_cold = emotion_analyzer(cascade, EmotionCache(max_entries=0))
+    translation_cold = TranslationService(BenchTranslator(args.translate_latency_ms), max_entries=0,
+                                          max_wait_ms=args.max_wait_ms)
+
+    timeouts = {'language': 30.0, 'translation': 30.0, 'emotion': 30.0, 'reply': 30.0}
+    pipeline = chat_turn_pipeline(detect_language_name, analyze_cold, generate_reply, timeouts,
+                                  translate=translation_cold.to_english)
+    pipeline_warm = chat_turn_pipeline(detect_language_name, analyze_emotion, generate_reply, timeouts,
+                                       translate=translation.to_english)
+
+    def full_turn(turn):
+        return pipeline.run(turn[0], target_language=turn[1])
+
+    def full_turn_warm(turn):
+        return pipeline_warm.run(turn[0], target_language=turn[1])
+
+    def speak(item):
+        # Same path as app.speak_stream: all segments submitted at once, done when the last is synthesized
+        for future in tts.submit_segments(*item):
+            future.result()
+
+    def speak_cold(item):
+        # A fresh tag on every segment, so shared sentences miss the cache too
+        text, lang = item
+        serial = next(cold_counter)
+        speak((" ".join(f"{serial} {segment}" for segment in split_sentences(text)), lang))
+
+    cold_counter = iter(range(10 ** 9))
+    fast_tier = LexiconModel()
+    for text, language in CORPUS:
+        translation.to_english(text, language)
+
+    latency = {
+        "detect_language": measure(detect_language_name, texts, args.repeat),
+        "detect_emotion": measure(analyze_cold, texts, args.repeat),
+        "detect_emotion_cached": measure(analyze_emotion, texts, args.repeat, warmup=len(texts)),
+        "model_forward": measure(lambda text: classifier(text), texts, args.repeat),
+        "detect_emotion_fast": measure(lambda text: fast_tier.predict([text]), texts, args.repeat),
+        "translate_cold": measure(lambda text: translation.translator.translate_batch([text]), texts, 1),
+        "translate_warm": measure(lambda turn: translation.to_english(*turn), turns, args.repeat),
+        "generate_reply": measure(lambda item: generate_reply(*item), reply_inputs, args.repeat),
+        "speak_cold": measure(speak_cold, speak_inputs, 1),
+        "speak_warm": measure(speak, speak_inputs, args.repeat, warmup=len(speak_inputs)),
+        "full_turn": measure(full_turn, turns, args.repeat),
+        "full_turn_warm": measure(full_turn_warm, turns, args.repeat, warmup=len(turns)),
+    }
+    latency["mood_update"] = measure(MoodTracker().update, mood_series, args.repeat)
+    mood = MoodTracker()
+    for emotion in mood_series:
+        mood.update(emotion)
+    try:
+        latency["create_mood_chart"] = measure(lambda tracker: build_mood_chart(tracker.series()), [mood], args.repeat, warmup=1)
+    except ImportError as exc:
+        print(f"create_mood_chart skipped: {exc}", file=sys.stderr)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "stub" if args.stub_model else args.backend,
+            "cascade_threshold": args.threshold,
+            "corpus": len(CORPUS),
+            "repeat": args.repeat,
+        },
+        "latency_ms": latency,
+        "throughput": {
+            "full_turn_by_concurrency": {
+                str(n): throughput(full_turn, turns, n, args.turns_per_level) for n in args.concurrency
+            },
+            "emotion_by_batch_size": {},
+        },
+    }
+    for size in args.batch_sizes:
+        batches = [[texts[(i + j) % len(texts)] for j in range(size)] for i in range(len(texts))]
+        started = time.perf_counter()
+        for batch in batches:
+            classifier(batch, batch_size=size, truncation=True)
+        elapsed = time.perf_counter() - started
+        results["throughput"]["emotion_by_batch_size"][str(size)] = size * len(batches) / elapsed
+
+    results["cascade"] = cascade.stats()
+    results["peak_rss_mb"] = peak_rss_mb()
+    batcher.close()
+    translation.close()
+    translation_cold.close()
+    pipeline.shutdown()
+    pipeline_warm.shutdown()
+    tts_dir.cleanup()
+    return results
+
+
+# --------- Reporting ---------
+def print_results(results):
+    print(f"{'stage':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in results["latency_ms"].items():
+        print(f"{stage:<20}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}")
+    for name, levels in results["throughput"].items():
+        print(f"{name}: " + ", ".join(f"{level}={rate:.1f} msg/s" for level, rate in levels.items()))
+    print(f"peak RSS: {results['peak_rss_mb']:.1f} MB")
+
+
+def compare(results, baseline, tolerance):
+    # Latency may grow and throughput may shrink by at most `tolerance` (a fraction)
+    regressions = []
+    for stage, stats in results["latency_ms"].items():
+        base = baseline.get("latency_ms", {}).get(stage)
+        if not base:
+            continue
+        for key in ("p50", "p95", "p99"):
+            if base[key] > 0 and stats[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{stage} {key}: {base[key]:.3f} -> {stats[key]:.3f} ms")
+    for name, levels in results["throughput"].items():
+        for level, rate in levels.items():
+            base = baseline.get("throughput", {}).get(name, {}).get(level)
+            if base and rate < base * (1 - tolerance):
+                regressions.append(f"{name}[{level}]: {base:.1f} -> {rate:.1f} msg/s")
+    base_rss = baseline.get("peak_rss_mb")
+    if base_rss and results["peak_rss_mb"] > base_rss * (1 + tolerance):
+        regressions.append(f"peak RSS: {base_rss:.1f} -> {results['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every stage of an Emotiva chat turn.")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=BACKENDS)
+    parser.add_argument("--stub-model", action="store_true", help="use a deterministic stand-in for the transformer")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the corpus per latency measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--turns-per-level", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="fast-tier confidence threshold")
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--tts-latency-ms", type=float, default=0.0, help="simulated synthesis latency")
+    parser.add_argument("--translate-latency-ms", type=float, default=0.0, help="simulated translation latency")
+    parser.add_argument("--mood-length", type=int, default=500, help="turns in the mood chart series")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="compare against a saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression as a fraction")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args)
+    print_results(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
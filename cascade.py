@@ -0,0 +1,207 @@
+import argparse
+import re
+import threading
+
+import numpy as np
+
+from session_store import EMOTION_LABELS
+
+# --------- Fast Tier: Lexicon Linear Model ---------
+# A bag-of-words linear model over a small emotion lexicon. Every word adds its
+# weight row to the message's logits, the sum is scaled by the share of words
+# the lexicon knows, and a softmax turns that into scores. "hi" or "thanks"
+# come out confident; longer messages that are mostly unknown words, or that
+# contain a negation, come out unsure and go on to the transformer.
+
+LEXICON = {
+    'neutral': (
+        "hi hii hello hey namaste ok okay k fine thanks thank thx ty you bye goodbye "
+        "order status track tracking update yes sure please refund delivery account"
+    ),
+    'joy': "happy glad great awesome amazing wonderful love loved excellent perfect nice",
+    'anger': "angry furious unacceptable worst hate ridiculous annoyed annoying pathetic useless",
+    'sadness': "sad disappointed unhappy upset depressed heartbroken miserable",
+    'fear': "scared afraid worried anxious nervous hacked fraud terrified",
+    'disgust': "disgusting gross revolting nasty filthy",
+    'surprise': "wow surprised unbelievable shocked unexpected omg",
+}
+NEGATIONS = "not no never don't dont didn't didnt isn't isnt can't cant cannot won't wont nothing nobody"
+WORD_WEIGHT = 3.0
+BIAS = {'neutral': 0.5}
+DEFAULT_THRESHOLD = 0.8
+
+_WORD = re.compile(r"[a-z']+")
+
+
+class LexiconModel:
+    def __init__(self, lexicon=LEXICON, negations=NEGATIONS, labels=EMOTION_LABELS, word_weight=WORD_WEIGHT, bias=BIAS):
+        self.labels = tuple(labels)
+        self.vocab = {}
+        rows = []
+        for label, words in lexicon.items():
+            for word in words.split():
+                if word not in self.vocab:
+                    self.vocab[word] = len(rows)
+                    rows.append(np.zeros(len(self.labels)))
+                rows[self.vocab[word]][self.labels.index(label)] += word_weight
+        self.negation_index = len(rows)
+        for word in negations.split():
+            self.vocab.setdefault(word, self.negation_index)
+        # The last row belongs to the negations and carries no weight
+        rows.append(np.zeros(len(self.labels)))
+        self.weights = np.vstack(rows)
+        self.bias = np.array([bias.get(label, 0.0) for label in self.labels])
+
+    def tokenize(self, text):
+        return _WORD.findall(text.lower().replace("’", "'"))
+
+    def predict(self, texts):
+        # Returns (probabilities [n, labels], confidence [n]) for the whole batch at once
+        n = len(texts)
+        doc_ids, word_ids = [], []
+        for i, text in enumerate(texts):
+            for word in self.tokenize(text):
+                doc_ids.append(i)
+                word_ids.append(self.vocab.get(word, -1))
+        doc_ids = np.asarray(doc_ids, dtype=np.intp)
+        word_ids = np.asarray(word_ids, dtype=np.intp)
+        known = word_ids >= 0
+
+        logits = np.zeros((n, len(self.labels)))
+        np.add.at(logits, doc_ids[known], self.weights[word_ids[known]])
+        totals = np.bincount(doc_ids, minlength=n)
+        coverage = np.bincount(doc_ids[known], minlength=n) / np.maximum(totals, 1)
+        logits = logits * coverage[:, None] + self.bias
+
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        confidence = probs.max(axis=1)
+        negated = np.bincount(doc_ids[word_ids == self.negation_index], minlength=n) > 0
+        confidence[negated | (totals == 0)] = 0.0
+        return probs, confidence
+
+    def scores(self, probs_row):
+        return [{'label': label, 'score': float(p)} for label, p in zip(self.labels, probs_row)]
+
+
+# --------- Cascade ---------
+# slow(texts) is any batch classifier returning pipeline-shaped score lists
+# (MicroBatcher.classify_many, EmotivaClient.classify_many, ...). Only messages
+# the fast tier is unsure about reach it. Results come back as (scores, tier)
+# with tier 'fast' or 'model'.
+
+class Cascade:
+    def __init__(self, slow, fast=None, threshold=DEFAULT_THRESHOLD):
+        self.slow = slow
+        self.fast = fast or LexiconModel()
+        self.threshold = threshold
+        self.counts = {'fast': 0, 'model': 0}
+        self._lock = threading.Lock()
+
+    def classify_many(self, texts):
+        probs, confidence = self.fast.predict(texts)
+        results = [None] * len(texts)
+        unsure = []
+        for i, conf in enumerate(confidence):
+            if conf >= self.threshold:
+                results[i] = (self.fast.scores(probs[i]), 'fast')
+            else:
+                unsure.append(i)
+        if unsure:
+            for i, scores in zip(unsure, self.slow([texts[i] for i in unsure])):
+                results[i] = (scores, 'model')
+        with self._lock:
+            self.counts['fast'] += len(texts) - len(unsure)
+            self.counts['model'] += len(unsure)
+        return results
+
+    def classify(self, text):
+        return self.classify_many([text])[0]
+
+    def stats(self):
+        with self._lock:
+            total = self.counts['fast'] + self.counts['model']
+            return dict(self.counts, skip_fraction=self.counts['fast'] / total if total else 0.0)
+
+
+# --------- Emotion Analysis ---------
+# The emotion path every chat turn takes: the emotion cache first, then the
+# cascade. analyze(text) returns (label, scores, tier) with tier 'cache',
+# 'fast' or 'model'; on_tier(tier) is called once per message.
+
+def emotion_analyzer(cascade, cache, on_tier=None):
+    def analyze(text):
+        tier = 'cache'
+
+        def compute(text):
+            nonlocal tier
+            result, tier = cascade.classify(text)
+            return result
+
+        result = cache.get_or_compute(text, compute)
+        if on_tier is not None:
+            on_tier(tier)
+        top = max(result, key=lambda x: x['score'])
+        return top['label'].lower(), result, tier
+
+    return analyze
+
+
+# --------- Threshold Evaluation ---------
+def _top(scores):
+    return max(scores, key=lambda x: x['score'])['label'].lower()
+
+
+def evaluate(texts, model_scores, thresholds, fast=None):
+    # model_scores are the transformer's results for texts, computed once and
+    # compared against the cascade's output at every threshold
+    fast = fast or LexiconModel()
+    probs, confidence = fast.predict(texts)
+    fast_labels = [fast.labels[i] for i in probs.argmax(axis=1)]
+    model_labels = [_top(scores) for scores in model_scores]
+    report = []
+    for threshold in thresholds:
+        skipped = [i for i, conf in enumerate(confidence) if conf >= threshold]
+        agree_skipped = sum(fast_labels[i] == model_labels[i] for i in skipped)
+        n = len(texts)
+        report.append({
+            "threshold": threshold,
+            "skip_fraction": len(skipped) / n if n else 0.0,
+            "fast_agreement": agree_skipped / len(skipped) if skipped else 1.0,
+            "cascade_agreement": (n - len(skipped) + agree_skipped) / n if n else 1.0,
+            "disagreements": [(texts[i], model_labels[i], fast_labels[i]) for i in skipped if fast_labels[i] != model_labels[i]],
+        })
+    return report
+
+
+def parse_args(argv=None):
+    from backends import BACKENDS, DEFAULT_BACKEND
+
+    parser = argparse.ArgumentParser(description="Compare the lexicon fast tier with the transformer at several thresholds.")
+    parser.add_argument("input", nargs="?", help="JSONL or CSV messages (default: the built-in parity corpus)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: from file extension)")
+    parser.add_argument("--text-field", default="text", help="field holding the message text")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=BACKENDS)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.85, 0.9, 0.95])
+    parser.add_argument("--show-disagreements", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from backends import PARITY_CORPUS, load_classifier
+    from batch_cli import read_records
+
+    args = parse_args()
+    if args.input:
+        fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+        texts = [str(record.get(args.text_field) or "") for record in read_records(args.input, fmt)]
+    else:
+        texts = list(PARITY_CORPUS)
+    model_scores = load_classifier(args.backend)(texts, batch_size=32, truncation=True)
+    print(f"{'threshold':>10}{'skipped':>10}{'fast agree':>12}{'overall':>10}")
+    for row in evaluate(texts, model_scores, args.thresholds):
+        print(f"{row['threshold']:>10.2f}{row['skip_fraction']:>10.1%}{row['fast_agreement']:>12.1%}{row['cascade_agreement']:>10.1%}")
+        if args.show_disagreements:
+            for text, model_label, fast_label in row["disagreements"]:
+                print(f"  {text!r}: {model_label} -> {fast_label}")
@@ -0,0 +1,46 @@
+import html
+
+# --------- Windowed Chat Rendering ---------
+# Each message is escaped and turned into its HTML fragment once, when it is
+# stored. Rendering joins only the fragments inside the visible window, and the
+# joined HTML is reused until the history or the window actually changes.
+
+CHAT_WINDOW = 50
+CHAT_PAGE_SIZE = 50
+
+
+def message_fragment(role, message):
+    css_class = "user-message" if role == "user" else "bot-message"
+    return f'<div class="{css_class}">{html.escape(message)}</div>'
+
+
+def make_entry(role, message, lang=''):
+    # (role, raw message, language, escaped HTML fragment)
+    return (role, message, lang, message_fragment(role, message))
+
+
+class ChatView:
+    def __init__(self, window=CHAT_WINDOW):
+        self.window = window
+        self._key = None
+        self._html = ''
+
+    def hidden_count(self, history):
+        return max(0, len(history) - self.window)
+
+    def load_earlier(self, page_size=CHAT_PAGE_SIZE):
+        self.window += page_size
+
+    def reset(self, window=CHAT_WINDOW):
+        self.window = window
+        self._key = None
+        self._html = ''
+
+    def render(self, history):
+        # History is append-only, so (list identity, length, window) identifies the output
+        key = (id(history), len(history), self.window)
+        if key != self._key:
+            fragments = ''.join(entry[3] for entry in history[-self.window:]) if self.window else ''
+            self._html = f'<div class="chat-container">{fragments}</div>'
+            self._key = key
+        return self._html
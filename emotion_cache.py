@@ -0,0 +1,122 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# --------- Classifier Output Cache ---------
+# Process-wide memo in front of the classifier. Keys are normalized text, values
+# are the full score vector so callers can still look past the argmax label.
+# Entries leave by LRU (max_entries) or age (ttl_seconds); wall-clock time is
+# used for expiry so a cache saved to disk keeps its TTL after a restart.
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text):
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", text)).strip().lower()
+
+
+class EmotionCache:
+    def __init__(self, max_entries=10000, ttl_seconds=24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (stored_at, ((label, score), ...))
+
+    def _expired(self, stored_at, now):
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    @staticmethod
+    def _pack(result):
+        return tuple((item['label'], float(item['score'])) for item in result)
+
+    @staticmethod
+    def _unpack(scores):
+        return [{'label': label, 'score': score} for label, score in scores]
+
+    def get(self, text):
+        key = normalize(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0], now):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._unpack(entry[1])
+
+    def put(self, text, result):
+        key = normalize(text)
+        with self._lock:
+            self._entries[key] = (time.time(), self._pack(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, text, compute):
+        cached = self.get(text)
+        if cached is not None:
+            return cached
+        result = compute(text)
+        self.put(text, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # --------- Persistence ---------
+    def save(self, path):
+        with self._lock:
+            rows = [[key, stored_at, list(map(list, scores))] for key, (stored_at, scores) in self._entries.items()]
+        partial = f"{path}.part"
+        with open(partial, "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "entries": rows}, fh, ensure_ascii=False)
+        os.replace(partial, path)
+        return len(rows)
+
+    def load(self, path):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return 0
+        now = time.time()
+        loaded = 0
+        with self._lock:
+            # Rows are saved oldest-first, so replaying them restores LRU order
+            for key, stored_at, scores in data.get("entries", []):
+                if self._expired(stored_at, now):
+                    continue
+                self._entries[key] = (stored_at, tuple((label, score) for label, score in scores))
+                self._entries.move_to_end(key)
+                loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return loaded
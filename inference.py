@@ -0,0 +1,258 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# --------- Cross-Session Micro-Batching ---------
+# Every Streamlit session submits its text here instead of calling the
+# classifier directly. One worker thread drains the queue into dynamic
+# batches so concurrent sessions share a single forward pass.
+
+_STOP = object()
+
+
+# --------- Long-Input Windows ---------
+# The model truncates at 512 tokens and attention cost grows with the square of
+# the length, so long messages are split into overlapping token windows that
+# are classified like separate texts. Window scores are then folded back into
+# one score list: 'mean', 'max' (per label, renormalized) or 'length'
+# (weighted by window length). Short messages pass through untouched, and
+# window_tokens=None turns splitting off for callables that aren't classifiers.
+WINDOW_TOKENS = 256
+WINDOW_OVERLAP = 64
+COMBINE_RULES = ("mean", "max", "length")
+
+
+def window_spans(length, window, overlap):
+    if length <= window:
+        return [(0, length)]
+    step = max(1, window - overlap)
+    spans = []
+    start = 0
+    while True:
+        end = min(start + window, length)
+        spans.append((start, end))
+        if end == length:
+            return spans
+        start += step
+
+
+def combine_scores(window_scores, lengths, rule="mean"):
+    if len(window_scores) == 1:
+        return window_scores[0]
+    labels = [item['label'] for item in window_scores[0]]
+    tables = [{item['label']: item['score'] for item in scores} for scores in window_scores]
+    if rule == "max":
+        raw = [max(table[label] for table in tables) for label in labels]
+    else:
+        weights = lengths if rule == "length" else [1] * len(tables)
+        raw = [sum(weight * table[label] for weight, table in zip(weights, tables)) for label in labels]
+    total = sum(raw) or 1.0
+    return [{'label': label, 'score': value / total} for label, value in zip(labels, raw)]
+
+
+class Chunker:
+    def __init__(self, classifier, window_tokens=WINDOW_TOKENS, window_overlap=WINDOW_OVERLAP, combine="mean"):
+        if combine not in COMBINE_RULES:
+            raise ValueError(f"Unknown combine rule '{combine}', expected one of {COMBINE_RULES}")
+        self.classifier = classifier
+        self.window_tokens = max(1, int(window_tokens)) if window_tokens else None
+        self.window_overlap = min(max(0, int(window_overlap)), self.window_tokens - 1) if window_tokens else 0
+        self.combine = combine
+
+    def windows(self, text):
+        # Returns [(window_text, token_count)]. Looked up per call: a warming-up
+        # classifier only gets its tokenizer once loaded.
+        tokenizer = getattr(self.classifier, "tokenizer", None)
+        tokens = None
+        if tokenizer is not None:
+            try:
+                tokens = tokenizer.tokenize(text)
+            except Exception:
+                tokens = None
+        if tokens is None:
+            tokens, tokenizer = text.split(), None
+        if self.window_tokens is None:
+            return [(text, len(tokens))]
+        spans = window_spans(len(tokens), self.window_tokens, self.window_overlap)
+        if len(spans) == 1:
+            return [(text, len(tokens))]
+        if tokenizer is None:
+            return [(" ".join(tokens[start:end]), end - start) for start, end in spans]
+        return [(tokenizer.convert_tokens_to_string(tokens[start:end]), end - start) for start, end in spans]
+
+    def merge(self, window_scores, lengths):
+        return combine_scores(window_scores, lengths, self.combine)
+
+    def __call__(self, texts, batch_size=32, **kwargs):
+        # Synchronous path for offline jobs: windows are sorted by length so
+        # every batch pads as little as possible
+        if isinstance(texts, str):
+            texts = [texts]
+        kwargs.setdefault("truncation", True)
+        pieces = [(i, window, length) for i, text in enumerate(texts) for window, length in self.windows(text)]
+        order = sorted(range(len(pieces)), key=lambda k: pieces[k][2])
+        scores = [None] * len(pieces)
+        for offset in range(0, len(order), batch_size):
+            group = order[offset:offset + batch_size]
+            results = self.classifier([pieces[k][1] for k in group], batch_size=len(group), **kwargs)
+            for k, result in zip(group, results):
+                scores[k] = result
+        grouped = [([], []) for _ in texts]
+        for (i, _, length), result in zip(pieces, scores):
+            grouped[i][0].append(result)
+            grouped[i][1].append(length)
+        return [self.merge(results, lengths) for results, lengths in grouped]
+
+
+class _Request:
+    __slots__ = ("text", "future", "enqueued", "windows")
+
+    def __init__(self, text):
+        self.text = text
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+        self.windows = 1
+
+
+class MicroBatcher:
+    def __init__(self, classifier, max_batch_size=16, max_wait_ms=10, bucket_width=16,
+                 window_tokens=WINDOW_TOKENS, window_overlap=WINDOW_OVERLAP, combine="mean"):
+        self.classifier = classifier
+        self.chunker = Chunker(classifier, window_tokens, window_overlap, combine)
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self.bucket_width = max(1, int(bucket_width)) if bucket_width else None
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "forward_passes": 0,
+            "windows": 0,
+            "long_inputs": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+            "batch_sizes": {},
+        }
+        self._worker = threading.Thread(target=self._run, name="emotiva-batcher", daemon=True)
+        self._worker.start()
+
+    # --------- Public API ---------
+    def submit(self, text):
+        request = _Request(text)
+        self._queue.put(request)
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["requests"] += 1
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+        return request.future
+
+    def classify(self, text, timeout=None):
+        return self.submit(text).result(timeout=timeout)
+
+    def classify_many(self, texts, timeout=None):
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def stats(self):
+        with self._lock:
+            batches = self._stats["batches"]
+            served = sum(size * count for size, count in self._stats["batch_sizes"].items())
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._stats["max_queue_depth"],
+                "requests": self._stats["requests"],
+                "batches": batches,
+                "forward_passes": self._stats["forward_passes"],
+                "windows": self._stats["windows"],
+                "long_inputs": self._stats["long_inputs"],
+                "mean_batch_size": served / batches if batches else 0.0,
+                "mean_wait_ms": self._stats["total_wait_ms"] / served if served else 0.0,
+                "batch_sizes": dict(sorted(self._stats["batch_sizes"].items())),
+            }
+
+    def close(self, timeout=None):
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+    # --------- Worker ---------
+    def _gather(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _pieces(self, batch):
+        # One piece per window; most requests are a single window
+        pieces = []
+        for request in batch:
+            windows = self.chunker.windows(request.text)
+            request.windows = len(windows)
+            pieces.extend((request, window, length) for window, length in windows)
+        return pieces
+
+    def _buckets(self, pieces):
+        # Group windows of similar length so each forward pass pads as little as possible;
+        # bucket_width=None sends the whole batch in one call (e.g. one network request)
+        if self.bucket_width is None:
+            return [pieces] if pieces else []
+        buckets = {}
+        for piece in pieces:
+            buckets.setdefault(piece[2] // self.bucket_width, []).append(piece)
+        return [buckets[key] for key in sorted(buckets)]
+
+    def _forward(self, bucket, results, failed):
+        try:
+            scores = self.classifier([piece[1] for piece in bucket], batch_size=len(bucket), truncation=True)
+        except Exception as exc:
+            for request, _, _ in bucket:
+                failed.setdefault(request, exc)
+            return
+        for (request, _, length), result in zip(bucket, scores):
+            window_scores, lengths = results.setdefault(request, ([], []))
+            window_scores.append(result)
+            lengths.append(length)
+
+    def _resolve(self, batch, results, failed):
+        for request in batch:
+            if request in failed:
+                request.future.set_exception(failed[request])
+                continue
+            try:
+                request.future.set_result(self.chunker.merge(*results[request]))
+            except Exception as exc:
+                request.future.set_exception(exc)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._gather(first)
+            started = time.perf_counter()
+            pieces = self._pieces(batch)
+            buckets = self._buckets(pieces)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["forward_passes"] += len(buckets)
+                self._stats["windows"] += len(pieces)
+                self._stats["long_inputs"] += sum(1 for r in batch if r.windows > 1)
+                sizes = self._stats["batch_sizes"]
+                sizes[len(batch)] = sizes.get(len(batch), 0) + 1
+                self._stats["total_wait_ms"] += sum((started - r.enqueued) * 1000.0 for r in batch)
+            results, failed = {}, {}
+            for bucket in buckets:
+                self._forward(bucket, results, failed)
+            self._resolve(batch, results, failed)
@@ -0,0 +1,221 @@
+import math
+import re
+
+# --------- Language Configuration ---------
+LANGUAGES = {
+    'English': {'code': 'en', 'tts': 'en'},
+    'हिन्दी': {'code': 'hi', 'tts': 'hi'},
+    'Hinglish': {'code': 'en', 'tts': 'en'},
+    'தமிழ்': {'code': 'ta', 'tts': 'ta'},
+    'తెలుగు': {'code': 'te', 'tts': 'te'},
+    'বাংলা': {'code': 'bn', 'tts': 'bn'},
+    'मराठी': {'code': 'mr', 'tts': 'mr'}
+}
+
+DEFAULT_LANGUAGE = 'English'
+
+# --------- Offline Language Detection ---------
+# Step 1: Unicode script. Each Indic block is 128 code points aligned on a
+# 128 boundary, so `ord(ch) >> 7` identifies the block in one shift.
+# Step 2: within a script shared by two languages (Devanagari: Hindi/Marathi,
+# Latin: English/Hinglish) a character n-gram model picks the language.
+
+_DEVANAGARI = 0x0900 >> 7
+_BENGALI = 0x0980 >> 7
+_TAMIL = 0x0B80 >> 7
+_TELUGU = 0x0C00 >> 7
+
+_SCRIPT_LANGUAGE = {
+    _BENGALI: 'বাংলা',
+    _TAMIL: 'தமிழ்',
+    _TELUGU: 'తెలుగు',
+}
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+_HINDI_SEED = """
+नमस्ते आप कैसे हैं मैं ठीक हूँ
+मेरा ऑर्डर अभी तक नहीं आया है कृपया मदद कीजिए
+मुझे अपना पैसा वापस चाहिए यह बहुत खराब है
+क्या आप मेरी समस्या हल कर सकते हैं
+मैं बहुत परेशान हूँ और मुझे समझ नहीं आ रहा
+आपका बहुत धन्यवाद आपने मेरी बहुत मदद की
+डिलीवरी कब तक होगी मुझे जल्दी चाहिए
+यह सामान टूटा हुआ आया है मैं इसे वापस करना चाहता हूँ
+मेरे खाते में कुछ गड़बड़ है और मैं डर गया हूँ
+आज मेरा दिन बहुत अच्छा था और मैं खुश हूँ
+मुझे नहीं पता कि मैं क्या करूँ कृपया बताइए
+वह कहता है कि उसका पार्सल कल आएगा
+हम लोग इसके बारे में बात कर रहे थे
+आप मुझे इसकी जानकारी दे सकते हैं क्या
+ठीक है नमस्ते हाँ नहीं मैं हूँ हैं है था थी
+नमस्ते प्रिय आप कैसे हैं मैं आपकी हर बात में मदत करने के लिए यहाँ हूँ
+आपके संदेश के लिए बहुत धन्यवाद प्रिय मैं यहाँ हूँ और आपकी हर जरूरत में मदत करने को तैयार हूँ
+"""
+
+_MARATHI_SEED = """
+नमस्कार तुम्ही कसे आहात मी ठीक आहे
+माझी ऑर्डर अजून आली नाही कृपया मदत करा
+मला माझे पैसे परत हवे आहेत हे खूप वाईट आहे
+तुम्ही माझी समस्या सोडवू शकता का
+मी खूप त्रासलो आहे आणि मला काही कळत नाही
+तुमचे खूप आभार तुम्ही मला खूप मदत केली
+डिलिव्हरी कधी होईल मला लवकर हवी आहे
+हे सामान तुटलेले आले आहे मला ते परत करायचे आहे
+माझ्या खात्यात काहीतरी गडबड आहे आणि मला भीती वाटते
+आज माझा दिवस खूप छान होता आणि मी आनंदी आहे
+मला माहित नाही मी काय करू कृपया सांगा
+तो म्हणतो की त्याचे पार्सल उद्या येईल
+आम्ही याबद्दल बोलत होतो
+तुम्ही मला याची माहिती देऊ शकाल का
+नमस्कार प्रिय तुम्ही कसे आहात मी तुमच्या सर्व गोष्टींमध्ये मदत करण्यासाठी इथे आहे
+तुमच्या संदेशासाठी खूप धन्यवाद प्रिय मी इथे आहे आणि तुमची जी गरज असेल त्यामध्ये मदत करण्यासाठी तयार आहे
+"""
+
+_ENGLISH_SEED = """
+hello how are you doing today
+my order has not arrived yet please help me
+i want my money back this is really bad
+can you solve my problem please
+i am very upset and i do not understand what is happening
+thank you so much you helped me a lot
+when will the delivery happen i need it soon
+the product arrived broken and i want to return it
+something is wrong with my account and i am scared
+today was a great day and i am happy
+i do not know what to do please tell me
+he says his parcel will come tomorrow
+we were talking about this yesterday
+could you give me more information about the refund status
+hi there thanks for the quick reply
+ok thanks hey hello this is fine
+where is my package it is late again
+"""
+
+_HINGLISH_SEED = """
+hello aap kaise ho main theek hun
+mera order abhi tak nahi aaya please help karo
+mujhe mera paisa wapas chahiye yeh bahut bura hai
+kya aap meri problem solve kar sakte ho
+main bahut pareshan hun aur mujhe samajh nahi aa raha
+aapka bahut shukriya aapne meri bahut help ki
+delivery kab tak hogi mujhe jaldi chahiye
+yeh saaman toota hua aaya hai main isko return karna chahta hun
+mere account mein kuch gadbad hai aur mujhe dar lag raha hai
+aaj mera din bahut accha tha aur main khush hun
+mujhe nahi pata main kya karun please batao
+woh keh raha hai ki uska parcel kal aayega
+hum log iske baare mein baat kar rahe the
+yaar kya scene hai refund ka bhai jaldi batao
+acha theek hai koi baat nahi
+main aapki har problem mein help karungi please batao kya issue hai
+"""
+
+
+def _grams(text, orders=(1, 2, 3)):
+    grams = []
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f" {word} "
+        size = len(padded)
+        for n in orders:
+            grams.extend(padded[i:i + n] for i in range(size - n + 1))
+    return grams
+
+
+def _counts(text):
+    counts = {}
+    for gram in _grams(text):
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+class NgramClassifier:
+    # Two-class character n-gram model. Both add-one smoothed distributions are
+    # folded into a single table of log-likelihood ratios, so classifying a
+    # message is one dict lookup per n-gram.
+    def __init__(self, first, first_seed, second, second_seed, bias=0.0):
+        self.first = first
+        self.second = second
+        self.bias = bias
+        first_counts, second_counts = _counts(first_seed), _counts(second_seed)
+        vocabulary = set(first_counts) | set(second_counts)
+
+        def totals(counts):
+            result = {}
+            for gram, count in counts.items():
+                result[len(gram)] = result.get(len(gram), 0) + count
+            return result
+
+        first_totals, second_totals = totals(first_counts), totals(second_counts)
+        sizes = {}
+        for gram in vocabulary:
+            sizes[len(gram)] = sizes.get(len(gram), 0) + 1
+
+        def logprob(counts, totals_, gram):
+            n = len(gram)
+            return math.log((counts.get(gram, 0) + 1.0) / (totals_.get(n, 0) + sizes.get(n, 0) + 1))
+
+        self.ratios = {
+            gram: logprob(second_counts, second_totals, gram) - logprob(first_counts, first_totals, gram)
+            for gram in vocabulary
+        }
+        self.unseen = {
+            n: math.log((first_totals.get(n, 0) + sizes.get(n, 0) + 1) / (second_totals.get(n, 0) + sizes.get(n, 0) + 1))
+            for n in (1, 2, 3)
+        }
+
+    def score(self, text):
+        # Positive means the text looks more like `second` than `first`
+        ratios = self.ratios
+        unseen = self.unseen
+        return sum(ratios[gram] if gram in ratios else unseen[len(gram)] for gram in _grams(text))
+
+    def classify(self, text):
+        return self.second if self.score(text) > self.bias else self.first
+
+
+# Hindi is the more common Devanagari language here, so Marathi needs a margin
+_DEVANAGARI_MODEL = NgramClassifier('हिन्दी', _HINDI_SEED, 'मराठी', _MARATHI_SEED, bias=3.0)
+# Likewise short Latin messages ("hi", "ok") are far more often English, so Hinglish needs a margin
+_LATIN_MODEL = NgramClassifier('English', _ENGLISH_SEED, 'Hinglish', _HINGLISH_SEED, bias=2.0)
+
+
+def _script_counts(text):
+    counts = {}
+    latin = 0
+    for ch in text:
+        if ch < '\x80':
+            if ch.isalpha():
+                latin += 1
+            continue
+        block = ord(ch) >> 7
+        counts[block] = counts.get(block, 0) + 1
+    return counts, latin
+
+
+def detect(text):
+    if not text or not text.strip():
+        return DEFAULT_LANGUAGE
+
+    counts, latin = _script_counts(text)
+    indic = {block: n for block, n in counts.items() if block in _SCRIPT_LANGUAGE or block == _DEVANAGARI}
+    if indic:
+        block = max(indic, key=indic.get)
+        if indic[block] >= latin:
+            if block == _DEVANAGARI:
+                return _DEVANAGARI_MODEL.classify(text)
+            return _SCRIPT_LANGUAGE[block]
+
+    if not latin:
+        return DEFAULT_LANGUAGE
+    return _LATIN_MODEL.classify(text)
+
+
+def detect_batch(texts):
+    # Support transcripts repeat lines a lot, so each distinct string is scored once
+    seen = {}
+    return [seen[text] if text in seen else seen.setdefault(text, detect(text)) for text in texts]
+
+
+def language_code(name):
+    return LANGUAGES.get(name, LANGUAGES[DEFAULT_LANGUAGE])['code']
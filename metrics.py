@@ -0,0 +1,211 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --------- Hot-Path Metrics ---------
+# Latency histograms (fixed buckets, plus a short rolling window for the debug
+# panel), labelled counters, per-session event counts and pull-style gauges.
+# Everything except the per-session counts, which are for the debug panel only,
+# is exported in Prometheus text format from a local endpoint. Session ids are
+# random, so as labels they would add new series with every chat.
+
+DEFAULT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+ROLLING_WINDOW = 200
+MAX_TRACKED_SESSIONS = 1000
+PREFIX = "emotiva_"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS, window=ROLLING_WINDOW):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            self.recent.append(value)
+
+    def rolling(self):
+        with self._lock:
+            ordered = sorted(self.recent)
+        if not ordered:
+            return {"p50": 0.0, "p95": 0.0, "max": 0.0, "samples": 0}
+        last = len(ordered) - 1
+        return {
+            "p50": ordered[int(0.50 * last)],
+            "p95": ordered[int(0.95 * last)],
+            "max": ordered[-1],
+            "samples": len(ordered),
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    def __init__(self, max_sessions=MAX_TRACKED_SESSIONS):
+        self.max_sessions = max_sessions
+        self._histograms = {}
+        self._counters = {}
+        self._sessions = OrderedDict()
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    # --------- Recording ---------
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name, value_ms):
+        self.histogram(name).observe(value_ms)
+
+    def timed(self, name):
+        histogram = self.histogram(name)
+
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe((time.perf_counter() - started) * 1000.0)
+            return wrapper
+
+        return decorate
+
+    def time(self, name):
+        return _Timer(self.histogram(name))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def count_session(self, session_id, event, value=1):
+        # Exported as session_events_total{event}; per-session counts stay in a
+        # bounded LRU so abandoned sessions don't pile up
+        self.inc("session_events", value, event=event)
+        with self._lock:
+            counts = self._sessions.pop(session_id, None) or {}
+            counts[event] = counts.get(event, 0) + value
+            self._sessions[session_id] = counts
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def session_counts(self, session_id):
+        with self._lock:
+            return dict(self._sessions.get(session_id, {}))
+
+    def gauge(self, name, func, help_text=""):
+        self._gauges[name] = (func, help_text)
+
+    # --------- Reading ---------
+    def rolling(self):
+        return {name: histogram.rolling() for name, histogram in sorted(self._histograms.items())}
+
+    def gauges(self):
+        values = {}
+        for name, (func, _) in sorted(self._gauges.items()):
+            try:
+                values[name] = float(func())
+            except Exception:
+                continue
+        return values
+
+    def render_prometheus(self):
+        lines = []
+        for name, histogram in sorted(self._histograms.items()):
+            metric = f"{PREFIX}{name}_latency_ms"
+            counts, total, count = histogram.snapshot()
+            lines.append(f"# HELP {metric} Latency of {name} in milliseconds.")
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {count}')
+            lines.append(f"{metric}_sum {total}")
+            lines.append(f"{metric}_count {count}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+
+        for name, value in self.gauges().items():
+            metric = f"{PREFIX}{name}"
+            help_text = self._gauges[name][1]
+            if help_text:
+                lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    # --------- Export ---------
+    def serve(self, port, host="127.0.0.1"):
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="emotiva-metrics", daemon=True).start()
+        return server
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.started) * 1000.0)
+        return False
+
+
+metrics = Metrics()
@@ -0,0 +1,244 @@
+import threading
+import time
+from collections import deque
+
+from session_store import (DEFAULT_DB_PATH, DEFAULT_RETENTION_DAYS, EMOTION_LABELS, Retention, emotion_code, open_db,
+                           pack_scores)
+
+# --------- Per-Session Mood Aggregates ---------
+# Updated once per turn, so opening the mood popup never rescans history:
+# per-label counts, counts over the last `window` turns, an exponentially
+# smoothed score vector, and a binned series for the chart. The series keeps
+# at most `max_points` bins; when it fills up, neighbouring bins are merged and
+# the bin width doubles, so a 10,000-turn session still draws ~100 points.
+
+DEFAULT_WINDOW = 20
+DEFAULT_ALPHA = 0.3
+DEFAULT_MAX_POINTS = 120
+
+
+def _vector(emotion, scores):
+    # Model scores in EMOTION_LABELS order; a fallback turn without scores counts as one-hot
+    if scores:
+        return list(pack_scores(scores))
+    vector = [0.0] * len(EMOTION_LABELS)
+    vector[emotion_code(emotion)] = 1.0
+    return vector
+
+
+class _Bin:
+    __slots__ = ("first", "last", "counts", "sums")
+
+    def __init__(self, first):
+        self.first = first
+        self.last = first
+        self.counts = [0] * len(EMOTION_LABELS)
+        self.sums = [0.0] * len(EMOTION_LABELS)
+
+    def add(self, turn, code, vector):
+        self.last = turn
+        self.counts[code] += 1
+        self.sums = [a + b for a, b in zip(self.sums, vector)]
+
+    def merge(self, other):
+        self.last = other.last
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sums = [a + b for a, b in zip(self.sums, other.sums)]
+
+    def point(self):
+        turns = sum(self.counts)
+        code = max(range(len(self.counts)), key=self.counts.__getitem__)
+        return {
+            'first': self.first + 1,
+            'last': self.last + 1,
+            'emotion': EMOTION_LABELS[code],
+            'turns': turns,
+            'scores': {label: total / turns for label, total in zip(EMOTION_LABELS, self.sums)},
+        }
+
+
+class MoodTracker:
+    def __init__(self, window=DEFAULT_WINDOW, alpha=DEFAULT_ALPHA, max_points=DEFAULT_MAX_POINTS):
+        self.window = window
+        self.alpha = alpha
+        self.max_points = max(2, max_points)
+        self.reset()
+
+    def reset(self):
+        self.turns = 0
+        self.counts = [0] * len(EMOTION_LABELS)
+        self.window_counts = [0] * len(EMOTION_LABELS)
+        self.ema = None
+        self.bin_width = 1
+        self._recent = deque()
+        self._bins = []
+
+    def update(self, emotion, scores=None):
+        code = emotion_code(emotion)
+        vector = _vector(emotion, scores)
+
+        self.counts[code] += 1
+        self._recent.append(code)
+        self.window_counts[code] += 1
+        if len(self._recent) > self.window:
+            self.window_counts[self._recent.popleft()] -= 1
+
+        if self.ema is None:
+            self.ema = vector
+        else:
+            self.ema = [self.alpha * v + (1 - self.alpha) * e for v, e in zip(vector, self.ema)]
+
+        if not self._bins or self._bins[-1].last - self._bins[-1].first + 1 >= self.bin_width:
+            if len(self._bins) == self.max_points:
+                self._compact()
+            self._bins.append(_Bin(self.turns))
+        self._bins[-1].add(self.turns, code, vector)
+        self.turns += 1
+
+    def _compact(self):
+        merged = []
+        for i in range(0, len(self._bins), 2):
+            head = self._bins[i]
+            if i + 1 < len(self._bins):
+                head.merge(self._bins[i + 1])
+            merged.append(head)
+        self._bins = merged
+        self.bin_width *= 2
+
+    def series(self):
+        return [b.point() for b in self._bins]
+
+    def snapshot(self):
+        return {
+            'turns': self.turns,
+            'counts': dict(zip(EMOTION_LABELS, self.counts)),
+            'window_counts': dict(zip(EMOTION_LABELS, self.window_counts)),
+            'ema': dict(zip(EMOTION_LABELS, self.ema or [0.0] * len(EMOTION_LABELS))),
+            'bin_width': self.bin_width,
+        }
+
+
+# --------- Fleet Rollup ---------
+# Every turn from every session is appended to mood_events. The same insert
+# transaction bumps two small rollup tables, so a dashboard refresh reads a
+# fixed number of rows no matter how many turns were ever recorded:
+#   mood_totals:  one row per label (turns, summed scores)
+#   mood_minutes: per-minute label counts, read over a bounded recent window
+# Events and minute rows older than `retention_days` are deleted at open and
+# then at most hourly from record(), like SpillDB; mood_totals keeps the
+# all-time counts.
+
+class FleetRollup:
+    def __init__(self, path=DEFAULT_DB_PATH, retention_days=DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_db(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mood_events ("
+            " ts REAL NOT NULL,"
+            " session_id TEXT NOT NULL,"
+            " emotion INTEGER NOT NULL"
+            ")"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mood_totals ("
+            " emotion INTEGER PRIMARY KEY,"
+            " turns INTEGER NOT NULL,"
+            " score_sum REAL NOT NULL"
+            ")"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mood_minutes ("
+            " minute INTEGER NOT NULL,"
+            " emotion INTEGER NOT NULL,"
+            " turns INTEGER NOT NULL,"
+            " PRIMARY KEY (minute, emotion)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS mood_events_ts ON mood_events (ts)")
+        self.retention = Retention(retention_days, self._expire)
+        self.retention.prune()
+
+    def _expire(self, cutoff):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._conn.execute("DELETE FROM mood_events WHERE ts < ?", (cutoff,)).rowcount
+                self._conn.execute("DELETE FROM mood_minutes WHERE minute < ?", (int(cutoff // 60),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def prune(self, now=None):
+        return self.retention.prune(now)
+
+    def record(self, session_id, emotion, scores=None, ts=None):
+        ts = time.time() if ts is None else ts
+        code = emotion_code(emotion)
+        vector = _vector(emotion, scores)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("INSERT INTO mood_events VALUES (?, ?, ?)", (ts, session_id, code))
+                self._conn.executemany(
+                    "INSERT INTO mood_totals VALUES (?, ?, ?) ON CONFLICT(emotion) DO UPDATE"
+                    " SET turns = turns + excluded.turns, score_sum = score_sum + excluded.score_sum",
+                    [(i, int(i == code), value) for i, value in enumerate(vector)],
+                )
+                self._conn.execute(
+                    "INSERT INTO mood_minutes VALUES (?, ?, 1) ON CONFLICT(minute, emotion) DO UPDATE"
+                    " SET turns = turns + 1",
+                    (int(ts // 60), code),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.retention.prune_if_due()
+
+    def totals(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT emotion, turns, score_sum FROM mood_totals").fetchall()
+        turns = {label: 0 for label in EMOTION_LABELS}
+        score_sums = {label: 0.0 for label in EMOTION_LABELS}
+        for code, count, score_sum in rows:
+            turns[EMOTION_LABELS[code]] = count
+            score_sums[EMOTION_LABELS[code]] = score_sum
+        total = sum(turns.values())
+        return {
+            'turns': total,
+            'counts': turns,
+            'mean_scores': {label: value / total if total else 0.0 for label, value in score_sums.items()},
+        }
+
+    def recent(self, minutes=60, now=None):
+        # [(minute start as unix time, {label: turns})], oldest first
+        now = time.time() if now is None else now
+        first = int(now // 60) - minutes + 1
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT minute, emotion, turns FROM mood_minutes WHERE minute >= ? ORDER BY minute", (first,)
+            ).fetchall()
+        buckets = {}
+        for minute, code, count in rows:
+            buckets.setdefault(minute, {label: 0 for label in EMOTION_LABELS})[EMOTION_LABELS[code]] = count
+        return [(minute * 60, counts) for minute, counts in sorted(buckets.items())]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    rollup = FleetRollup(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH)
+    summary = rollup.totals()
+    print(f"{summary['turns']} turns across all sessions")
+    for label in EMOTION_LABELS:
+        print(f"  {label:<10}{summary['counts'][label]:>8}  mean score {summary['mean_scores'][label]:.3f}")
+    for started, counts in rollup.recent(15):
+        busiest = max(counts, key=counts.get)
+        print(f"{time.strftime('%H:%M', time.localtime(started))}  {sum(counts.values()):>5} turns, mostly {busiest}")
@@ -0,0 +1,49 @@
+# --------- Mood Analysis Chart ---------
+# Drawn from MoodTracker.series(): one point per bin of consecutive turns,
+# showing the bin's most frequent emotion. Short sessions have one turn per bin.
+EMOTION_COLORS = {
+    'joy': '#4CAF50',
+    'sadness': '#2196F3',
+    'anger': '#F44336',
+    'fear': '#FF9800',
+    'surprise': '#9C27B0',
+    'disgust': '#795548',
+    'neutral': '#607D8B',
+}
+
+
+def build_mood_chart(series):
+    import plotly.graph_objects as go
+
+    if not series:
+        return None
+
+    labels = [
+        f"Message {point['first']}" if point['first'] == point['last'] else f"Messages {point['first']}–{point['last']}"
+        for point in series
+    ]
+    emotions = [point['emotion'] for point in series]
+    colors = [EMOTION_COLORS.get(emotion, '#607D8B') for emotion in emotions]
+
+    fig = go.Figure(data=go.Scatter(
+        x=[(point['first'] + point['last']) / 2 for point in series],
+        y=emotions,
+        mode='markers+lines',
+        marker=dict(size=12, color=colors, line=dict(width=2, color='white')),
+        line=dict(width=3, color='rgba(50, 50, 50, 0.8)'),
+        text=labels,
+        hovertemplate='<b>%{text}</b><br>Emotion: %{y}<br><extra></extra>'
+    ))
+
+    fig.update_layout(
+        title='Customer Mood Journey',
+        xaxis_title='Message Number',
+        yaxis_title='Detected Emotion',
+        height=400,
+        showlegend=False,
+        paper_bgcolor='#2d2d2d',
+        plot_bgcolor='#2d2d2d',
+        font=dict(color='white')
+    )
+
+    return fig
@@ -0,0 +1,127 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# --------- Per-Turn Processing Pipeline ---------
+# A chat turn is a small set of stages. Stages without dependencies start
+# together on a shared thread pool; a stage that needs another stage's result
+# starts as soon as that result (or its fallback) is available. Every stage has
+# its own timeout, and a stage that times out or fails yields its fallback so
+# one slow call cannot stall the reply. A timed-out call that is still queued
+# is cancelled; one that already started keeps its worker until it returns, but
+# the turn no longer waits for it. Light stages (microsecond lookups) run on
+# their own small pool, so a backlog of model calls can't starve them.
+
+
+class Stage:
+    def __init__(self, name, func, timeout, fallback, needs=(), light=False):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.fallback = fallback
+        self.needs = tuple(needs)
+        self.light = light
+
+    def fallback_value(self, turn):
+        return self.fallback(turn) if callable(self.fallback) else self.fallback
+
+
+def _timed(func, turn):
+    started = time.perf_counter()
+    value = func(turn)
+    return value, (time.perf_counter() - started) * 1000.0
+
+
+class TurnPipeline:
+    def __init__(self, stages, max_workers=8, executor=None, light_workers=2):
+        names = set()
+        for stage in stages:
+            missing = [need for need in stage.needs if need not in names]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs {missing}, which must be declared before it")
+            names.add(stage.name)
+        self.stages = list(stages)
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="emotiva-turn")
+        self.light_executor = ThreadPoolExecutor(max_workers=light_workers, thread_name_prefix="emotiva-turn-light")
+
+    def _submit(self, stage, turn):
+        executor = self.light_executor if stage.light else self.executor
+        return executor.submit(_timed, stage.func, dict(turn)), time.perf_counter()
+
+    def run(self, text, **context):
+        started = time.perf_counter()
+        turn = dict(context, text=text)
+        timings = {}
+        fallbacks = {}
+        submitted = {}
+
+        for stage in self.stages:
+            if not stage.needs:
+                submitted[stage.name] = self._submit(stage, turn)
+
+        for stage in self.stages:
+            if stage.name not in submitted:
+                submitted[stage.name] = self._submit(stage, turn)
+            future, submitted_at = submitted[stage.name]
+            remaining = stage.timeout - (time.perf_counter() - submitted_at)
+            try:
+                value, elapsed = future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                future.cancel()
+                value, elapsed = stage.fallback_value(turn), stage.timeout * 1000.0
+                fallbacks[stage.name] = "timeout"
+            except Exception as exc:
+                value, elapsed = stage.fallback_value(turn), (time.perf_counter() - submitted_at) * 1000.0
+                fallbacks[stage.name] = f"error: {exc.__class__.__name__}"
+            turn[stage.name] = value
+            timings[stage.name] = elapsed
+
+        timings["total"] = (time.perf_counter() - started) * 1000.0
+        result = {stage.name: turn[stage.name] for stage in self.stages}
+        result["timings_ms"] = timings
+        result["fallbacks"] = fallbacks
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        self.light_executor.shutdown(wait=False)
+
+
+# --------- Chat Turn ---------
+# Language and emotion run concurrently; the reply starts once the emotion is known.
+# Language detection and the reply are table lookups, so they run as light stages.
+# detect_language returns a LANGUAGES name. With a translate(text, language)
+# function, non-English text (Hinglish included) is translated once after
+# language detection and the emotion stage classifies that translation.
+# analyze_emotion returns (label, scores, tier); timeouts are in seconds.
+DEFAULT_STAGE_TIMEOUTS = {'language': 0.5, 'translation': 1.5, 'emotion': 3.0, 'reply': 0.5}
+
+
+def chat_turn_pipeline(detect_language, analyze_emotion, generate_reply, timeouts=DEFAULT_STAGE_TIMEOUTS,
+                       translate=None, **kwargs):
+    stages = [Stage('language', lambda turn: detect_language(turn['text']), timeouts['language'], 'English', light=True)]
+    if translate is None:
+        stages.append(Stage('emotion', lambda turn: analyze_emotion(turn['text']), timeouts['emotion'], ('neutral', [], 'fallback')))
+    else:
+        stages.append(Stage(
+            'translation',
+            lambda turn: translate(turn['text'], turn['language']),
+            timeouts['translation'],
+            lambda turn: turn['text'],
+            needs=('language',),
+        ))
+        stages.append(Stage(
+            'emotion',
+            lambda turn: analyze_emotion(turn['translation']),
+            timeouts['emotion'],
+            ('neutral', [], 'fallback'),
+            needs=('translation',),
+        ))
+    stages.append(Stage(
+        'reply',
+        lambda turn: generate_reply(turn['text'], turn['emotion'][0], turn['target_language']),
+        timeouts['reply'],
+        lambda turn: generate_reply('', 'neutral', turn['target_language']),
+        needs=('emotion',),
+        light=True,
+    ))
+    return TurnPipeline(stages, **kwargs)
@@ -0,0 +1,198 @@
+from types import MappingProxyType
+
+# --------- Reply Templates ---------
+# Loaded once at import and frozen; generate_reply() only does lookups.
+
+def _freeze(table):
+    return MappingProxyType({key: _freeze(value) if isinstance(value, dict) else value for key, value in table.items()})
+
+CORE_REPLIES = _freeze({
+    'greeting': {
+        'English': "Hello dear! How are you doing today? I'm here to help you with anything you need!",
+        'हिन्दी': "नमस्ते प्रिय! आप कैसे हैं? मैं आपकी हर बात में मदत करने के लिए यहाँ हूँ!",
+        'Hinglish': "Hello dear! Aap kaise hain? Main aapki har help karne ke liye yahan hun!",
+        'தமிழ்': "வணக்கம் அன்பே! நீங்கள் எப்படி இருக்கிறீர்கள்? நான் உங்களுக்கு எல்லாவற்றிலும் உதவ இங்கே இருக்கிறேன்!",
+        'తెలుగు': "నమస్కారం ప్రియమైన! మీరు ఎలా ఉన్నారు? నేను మీకు అన్ని విషయాల్లో సహాయం చేయడానికి ఇక్కడ ఉన్నాను!",
+        'বাংলা': "নমস্কার প্রিয়! আপনি কেমন আছেন? আমি আপনার সব কিছুতে সাহায্য করতে এখানে আছি!",
+        'मराठी': "नमस्कार प्रिय! तुम्ही कसे आहात? मी तुमच्या सर्व गोष्टींमध्ये मदत करण्यासाठी इथे आहे!"
+    },
+    'help': {
+        'English': "Oh sweetie, I'm here to help you through this! Please tell me more about what's troubling you, and I'll do my best to assist you!",
+        'हिन्दी': "अरे प्यारे, मैं आपकी हर परेशानी में आपके साथ हूँ! कृपया अपनी समस्या बताएं, मैं पूरी कोशिश करूंगी!",
+        'Hinglish': "Oh sweetie, main aapki har problem mein help karungi! Please batao kya issue hai, main puri koshish karungi!",
+        'தமிழ்': "ஓ அன்பே, இதில் உங்களுக்கு உதவ நான் இங்கே இருக்கிறேன்! உங்களை தொந்தரவு செய்வது என்னவென்று சொல்லுங்கள், நான் முடிந்த உதவி செய்வேன்!",
+        'తెలుగు': "ఓ చెల్లీ, ఈ విषయంలో మీకు సహాయం చేయడానికి నేను ఇక్కడ ఉన్నాను! మిమ్మల్ని ఇబ్బంది పెట్టేది ఏమిటో చెప్పండి, నేను నా వంతు సహాయం చేస్తాను!",
+        'বাংলা': "ওহ সোনা, আমি এখানে আপনার সাহায্য করতে আছি! আপনার কী সমস্যা হচ্ছে তা বলুন, আমি যথাসাধ্য সাহায্য করব!",
+        'मराठी': "अरे प्रिय, मी तुमच्या मदतीसाठी इथे आहे! तुम्हाला काय त्रास होत आहे ते सांगा, मी माझी पूर्ण मदत करेन!"
+    },
+    'order': {
+        'English': "Of course honey! I'd be happy to help you with your order. Could you please share more details so I can assist you better?",
+        'हिन्दी': "बिल्कुल प्रिय! मैं आपकी ऑर्डर में खुशी से मदत करूंगी। कृपया और जानकारी दें ताकि मैं बेहतर सहायता कर सकूं!",
+        'Hinglish': "Bilkul honey! Main aapki order mein khushi se help karungi. Please aur details share karo taki main better assist kar sakun!",
+        'தமிழ்': "நிச்சயமாக அன்பே! உங்கள் ஆர்டருக்கு உதவ நான் மகிழ்ச்சியாக இருக்கிறேன். மேலும் விவரங்களைப் பகிர்ந்து கொள்ளுங்கள், நான் சிறப்பாக உதவ முடியும்!",
+        'తెలుగు': "అయ్యో ఖచ్చితంగా! మీ ఆర్డర్‌లో సహాయం చేయడానికి నేను సంతోషిస్తాను. మరింత వివరాలు షేర్ చేయండి, నేను మంచిగా సహాయం చేయగలను!",
+        'বাংলা': "অবশ্যই প্রিয়! আপনার অর্ডারে সাহায্য করতে আমি খুশি হব। আরও বিস্তারিত জানান যাতে আমি আরও ভালো সাহায্য করতে পারি!",
+        'मराठी': "नक्कीच प्रिय! तुमच्या ऑर्डरमध्ये मदत करण्यात मला आनंद होईल। अधिक तपशील द्या जेणेकरून मी चांगली मदत करू शकेन!"
+    },
+    'default': {
+        'English': "Thank you so much for your message, dear! I'm here and ready to help you with whatever you need! How can I make your day better?",
+        'हिन्दी': "आपके संदेश के लिए बहुत धन्यवाद प्रिय! मैं यहाँ हूँ और आपकी हर जरूरत में मदत करने को तैयार हूँ! आपका दिन कैसे बेहतर बनाऊं?",
+        'Hinglish': "Thank you so much dear! Main yahan hun aur aapki har need mein help karne ko ready hun! Aapka din kaise better banau?",
+        'தமிழ்': "உங்கள் செய்திக்கு மிக்க நன்றி அன்பே! நான் இங்கே இருக்கிறேன், உங்களுக்கு தேவையான எதிலும் உதவ தயார்! உங்கள் நாளை எப்படி சிறப்பாக்கலாம்?",
+        'తెలుగు': "మీ సందేశానికి చాలా ధన్యవాదాలు ప్రియमైన! నేను ఇక్కడ ఉన్నాను, మీకు అవసరమైన దేనిలోనైనా సహాయం చేయడానికి సిద్ధంగా ఉన్నాను! మీ రోజును ఎలా మెరుగుపరచాలి?",
+        'বাংলা': "আপনার বার্তার জন্য অনেক ধন্যবাদ প্রিয়! আমি এখানে আছি এবং আপনার যা প্রয়োজন তাতে সাহায্য করতে প্রস্তুত! আপনার দিনটি কীভাবে আরও ভালো করতে পারি?",
+        'मराठी': "तुमच्या संदेशासाठी खूप धन्यवाद प्रिय! मी इथे आहे आणि तुमची जी गरज असेल त्यामध्ये मदत करण्यासाठी तयार आहे! तुमचा दिवस कसा चांगला करू?"
+    },
+})
+
+# Keyed on the classifier's labels (see session_store.EMOTION_LABELS)
+EMPATHY = _freeze({
+    'joy': {
+        'English': "I can feel your positive energy radiating through! ",
+        'हिन्दी': "मैं आपकी सकारात्मक ऊर्जा महसूस कर सकती हूँ! ",
+        'Hinglish': "Main aapki positive energy feel kar sakti hun! ",
+        'தமிழ்': "உங்கள் நேர்மறை ஆற்றலை என்னால் உணர முடிகிறது! ",
+        'తెలుగు': "మీ సానుకూల శక్తిని నేను అనుభవించగలను! ",
+        'বাংলা': "আমি আপনার ইতিবাচক শক্তি অনুভব করতে পারছি! ",
+        'मराठी': "मी तुमची सकारात्मक ऊर्जा जाणवू शकते! "
+    },
+    'sadness': {
+        'English': "I can sense you're feeling down, sweetheart. I'm here for you. ",
+        'हिन्दी': "मैं महसूस कर सकती हूँ कि आप उदास हैं प्रिय। मैं आपके साथ हूँ। ",
+        'Hinglish': "Main feel kar sakti hun ki aap sad hain dear. Main aapke saath hun. ",
+        'தமிழ்': "நீங்கள் வருத்தமாக உணர்கிறீர்கள் என்பதை என்னால் உணர முடிகிறது அன்பே। நான் உங்களுடன் இருக்கிறேன். ",
+        'తెలుగు': "మీరు దుఃఖంగా ఉన్నారని నేను అర్థం చేసుకోగలను ప్రియమైన. నేను మీతో ఉన్నాను। ",
+        'বাংলা': "আমি বুঝতে পারছি আপনি মন খারাপ অনুভব করছেন প্রিয়। আমি আপনার সাথে আছি। ",
+        'मराठी': "मी समजू शकते की तुम्हाला वाईट वाटत आहे प্রিय়। मी तुमच्या সোबत आहे। "
+    },
+    'anger': {
+        'English': "I can feel your frustration, dear. Let me help you work through this gently. ",
+        'हिन्दी': "मैं आपकी परेशानी समझ सकती हूँ प्रिय। आइए इसे धीरे-धीरे हल करते हैं। ",
+        'Hinglish': "Main aapki frustration samajh sakti hun dear. Chaliye ise gently solve karte hain. ",
+        'தமிழ்': "உங்கள் கோபத்தை என்னால் உணர முடிகிறது அன்பே। இதை மெதுவாக தீர்க்க உதவுகிறேன். ",
+        'తెలుగు': "మీ నిరాశను నేను అర్థం చేసుకోగలను ప్రియమైన. దీన్ని మెల్లగా పరిష్కరించడంలో సహాయం చేస్తాను। ",
+        'বাংলা': "আমি আপনার হতাশা বুঝতে পারছি প্রিয়। আসুন এটি ধীরে ধীরে সমাধান করি। ",
+        'मराठी': "मी तुमची नाराजी समजू शकते প्রিয়। चला याचे हळूवारपणे निराकरण करूया। "
+    },
+    'fear': {
+        'English': "I can sense your worry, honey. Don't be afraid, I'm here to guide you step by step. ",
+        'हिन्दी': "मैं आपकी चिंता समझ सकती हूँ प्रिय। डरिए मत, मैं आपको कदम-कदम पर मार्गदर्शन दूंगी। ",
+        'Hinglish': "Main aapki worry samajh sakti hun honey. Dare mat, main step by step guide karungi. ",
+        'தமிழ்': "உங்கள் கவலையை என்னால் உணர முடிகிறது அன்பே। பயப்பட வேண்டாம், நான் படிப்படியாக வழிகாட்டுகிறேன். ",
+        'తెలుగు': "మీ ఆందోళనను నేను అర్థం చేసుకోగలను ప్రియమైన. భయపడకండి, నేను మిమ్మల్ని దశలవారీగా మార్గనిర్దేశం చేస్తాను। ",
+        'বাংলা': "আমি আপনার চিন্তা বুঝতে পারছি প্রিয়। ভয় পাবেন না, আমি আপনাকে ধাপে ধাপে গাইড করব। ",
+        'मराठी': "मী तुमची चिंता समजू शकते প্রিয়। घाबरू नका, मी तुम्हाला टप्प्या टप्प्याने मार्गदर्शन करेन। "
+    }
+})
+
+# --------- Intents ---------
+# Listed in priority order: when a message matches several intents, the
+# earliest one wins (a greeting beats a help request, which beats an order query).
+INTENTS = (
+    ('greeting', ("hi", "hello", "hey", "heyy")),
+    ('help', ("help", "issue", "issues", "problem", "problems", "confused", "can't", "can’t", "cannot")),
+    ('order', ("order", "orders", "delivery", "deliveries", "refund", "refunds", "status")),
+)
+DEFAULT_INTENT = 'default'
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class IntentRouter:
+    # Aho-Corasick automaton over every keyword of every intent. A message is
+    # scanned once regardless of how many keywords exist, and a match only
+    # counts when it sits on word boundaries ("hi" does not fire on "this").
+    def __init__(self, intents, default=DEFAULT_INTENT):
+        self.default = default
+        self.intents = tuple(name for name, _ in intents)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for priority, (_, keywords) in enumerate(intents):
+            for keyword in keywords:
+                self._add(keyword.lower(), priority)
+        self._link()
+
+    def _add(self, keyword, priority):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = self._out[state] + ((len(keyword), priority),)
+
+    def _link(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._goto = tuple(self._goto)
+        self._fail = tuple(self._fail)
+        self._out = tuple(self._out)
+
+    def route(self, text):
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        size = len(text)
+        best = len(self.intents)
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, priority in out[state]:
+                if priority >= best:
+                    continue
+                start = end - length + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end + 1 < size and _is_word_char(text[end + 1]):
+                    continue
+                best = priority
+                if best == 0:
+                    return self.intents[0]
+        return self.intents[best] if best < len(self.intents) else self.default
+
+    def route_batch(self, texts):
+        return [self.route(text) for text in texts]
+
+
+router = IntentRouter(INTENTS)
+
+# Every (intent, emotion, language) reply is assembled once up front
+_REPLIES = MappingProxyType({
+    (intent, emotion, language): f"{EMPATHY.get(emotion, {}).get(language, '')}{text}"
+    for intent, by_language in CORE_REPLIES.items()
+    for emotion in (*EMPATHY, None)
+    for language, text in by_language.items()
+})
+
+
+# --------- Generate Female Reply ---------
+def generate_reply(user_input, emotion, language):
+    intent = router.route(user_input)
+    reply = _REPLIES.get((intent, emotion, language))
+    return reply if reply is not None else _REPLIES[(intent, None, language)]
+
+
+def generate_replies(items):
+    return [generate_reply(user_input, emotion, language) for user_input, emotion, language in items]
+
+
+def all_replies():
+    # Every distinct reply text with its language, e.g. for pre-warming TTS
+    return [(reply, language) for (_, _, language), reply in _REPLIES.items()]
@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import base64
+import json
+from http import HTTPStatus
+
+from backends import BACKENDS, DEFAULT_BACKEND, load_classifier
+from emotion_cache import EmotionCache, normalize
+from inference import COMBINE_RULES, MicroBatcher
+from language import DEFAULT_LANGUAGE, LANGUAGES, detect as detect_language_name, language_code
+from replies import generate_reply
+from translation import TRANSLATORS, TranslationService, load_translator
+
+# --------- Async Inference Service ---------
+# A small HTTP/1.1 server on asyncio streams (keep-alive, JSON bodies) so model
+# replicas can run apart from the Streamlit UI. Emotion requests from every
+# connection are translated to English like in the UI, answered from a shared
+# cache, identical in-flight texts are coalesced, and the rest go through a
+# MicroBatcher into one model.
+#
+#   POST /emotion   {"text"}                          -> {"label", "scores", "translation"}
+#   POST /language  {"text"}                          -> {"language", "code"}
+#   POST /reply     {"text", "emotion", "language"}   -> {"reply"}
+#   POST /tts       {"text", "lang"}                  -> audio/mpeg
+#   POST /<endpoint>/batch takes {"items": [...]} and returns {"results": [...]}
+#   GET  /health
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+# Keep-alive connections idle for longer are closed; the client retries on a fresh socket
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _field(item, name, default=None):
+    value = item.get(name, default)
+    if not isinstance(value, str):
+        raise BadRequest(f"'{name}' must be a string")
+    return value
+
+
+class EmotivaService:
+    def __init__(self, classifier, tts=None, cache=None, max_batch_size=32, max_wait_ms=5, combine="mean",
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, translation=None):
+        self.batcher = MicroBatcher(classifier, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, combine=combine)
+        self.cache = cache or EmotionCache()
+        self.tts = tts
+        self.idle_timeout = idle_timeout
+        # Without a TranslationService the classifier sees the original text
+        self.translation = translation
+        self._inflight = {}
+        self._routes = {
+            "/emotion": self.emotion,
+            "/language": self.language,
+            "/reply": self.reply,
+            "/tts": self.speak,
+        }
+
+    # --------- Endpoints ---------
+    async def classify(self, text):
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached
+        key = normalize(text)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.wrap_future(self.batcher.submit(text))
+            self._inflight[key] = future
+
+            def finished(done):
+                self._inflight.pop(key, None)
+                if not done.cancelled() and done.exception() is None:
+                    self.cache.put(text, done.result())
+
+            future.add_done_callback(finished)
+        return await asyncio.shield(future)
+
+    async def emotion(self, item):
+        text = _field(item, "text")
+        if self.translation is not None:
+            text = await asyncio.wrap_future(self.translation.submit_english(text, detect_language_name(text)))
+        result = await self.classify(text)
+        top = max(result, key=lambda x: x['score'])
+        return {"label": top['label'].lower(), "scores": result, "translation": text}
+
+    async def language(self, item):
+        name = detect_language_name(_field(item, "text"))
+        return {"language": name, "code": language_code(name)}
+
+    async def reply(self, item):
+        language = _field(item, "language", DEFAULT_LANGUAGE)
+        if language not in LANGUAGES:
+            raise BadRequest(f"Unknown language '{language}'")
+        return {"reply": generate_reply(_field(item, "text"), _field(item, "emotion", "neutral"), language)}
+
+    async def speak(self, item):
+        if self.tts is None:
+            from tts_cache import TTSCache
+            self.tts = TTSCache()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.tts.get, _field(item, "text"), _field(item, "lang", "en"))
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "batcher": self.batcher.stats(), "cache": self.cache.stats()}
+        batch = path.endswith("/batch")
+        handler = self._routes.get(path[:-len("/batch")] if batch else path)
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"No endpoint {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise BadRequest("Body must be a JSON object")
+            if not batch:
+                return HTTPStatus.OK, await handler(payload)
+            items = payload.get("items")
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                raise BadRequest("'items' must be a list of objects")
+            results = await asyncio.gather(*(handler(item) for item in items))
+            if handler == self.speak:
+                results = [base64.b64encode(audio).decode("ascii") for audio in results]
+            return HTTPStatus.OK, {"results": results}
+        except (ValueError, BadRequest) as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{exc.__class__.__name__}: {exc}"}
+
+    # --------- HTTP ---------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, result = await self.route(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, result, keep_alive):
+        if isinstance(result, bytes):
+            body, content_type = result, "audio/mpeg"
+        else:
+            body, content_type = json.dumps(result, ensure_ascii=False).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def main(args):
+    service = EmotivaService(load_classifier(args.backend), max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                             combine=args.combine, translation=TranslationService(load_translator(args.translator)))
+    server = await service.serve(args.host, args.port)
+    print(f"Emotiva service listening on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Emotiva inference service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=BACKENDS)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--translator", default="google", choices=TRANSLATORS, help="how non-English text is translated")
+    parser.add_argument("--combine", default="mean", choices=COMBINE_RULES, help="how long-message window scores are combined")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+import base64
+import http.client
+import json
+import queue
+from urllib.parse import urlsplit
+
+# --------- Inference Service Client ---------
+# Thread-safe client for service.py. Keep-alive connections are pooled, so
+# concurrent Streamlit sessions reuse sockets instead of reconnecting per call.
+
+
+class ServiceError(Exception):
+    pass
+
+
+class EmotivaClient:
+    def __init__(self, base_url, pool_size=8, timeout=10.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connection(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # A pooled socket may have been closed by the server while idle; retry once on a fresh one
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status != 200:
+                try:
+                    message = json.loads(data).get("error", "")
+                except ValueError:
+                    message = data[:200].decode("utf-8", "replace")
+                raise ServiceError(f"{method} {path} failed with {response.status}: {message}")
+            if response.getheader("Content-Type", "").startswith("application/json"):
+                return json.loads(data)
+            return data
+
+    # --------- Endpoints ---------
+    def classify(self, text):
+        # Same shape as classifier(text)[0]: a list of {'label', 'score'} dicts
+        return self._request("POST", "/emotion", {"text": text})["scores"]
+
+    def classify_many(self, texts):
+        results = self._request("POST", "/emotion/batch", {"items": [{"text": text} for text in texts]})["results"]
+        return [result["scores"] for result in results]
+
+    def language(self, text):
+        return self._request("POST", "/language", {"text": text})
+
+    def languages(self, texts):
+        return self._request("POST", "/language/batch", {"items": [{"text": text} for text in texts]})["results"]
+
+    def reply(self, text, emotion, language):
+        return self._request("POST", "/reply", {"text": text, "emotion": emotion, "language": language})["reply"]
+
+    def replies(self, items):
+        payload = {"items": [{"text": text, "emotion": emotion, "language": language} for text, emotion, language in items]}
+        return [result["reply"] for result in self._request("POST", "/reply/batch", payload)["results"]]
+
+    def tts(self, text, lang="en"):
+        return self._request("POST", "/tts", {"text": text, "lang": lang})
+
+    def tts_many(self, items):
+        payload = {"items": [{"text": text, "lang": lang} for text, lang in items]}
+        return [base64.b64decode(audio) for audio in self._request("POST", "/tts/batch", payload)["results"]]
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,202 @@
+import sqlite3
+import threading
+import time
+from array import array
+from collections import deque
+
+from chat_render import make_entry
+
+# --------- Compact Session Store ---------
+# Each session keeps only its last `ring_size` turns in memory. A turn is one
+# user message plus the bot reply, with the emotion stored as a small integer
+# code and the model's scores as a float32 array in EMOTION_LABELS order.
+# Turns pushed out of the ring are written to a shared SQLite file (WAL mode)
+# and read back only when older history is needed.
+# Spilled turns older than `retention_days` are deleted when the file is opened
+# and then at most once per PRUNE_INTERVAL seconds from the write path, so
+# abandoned sessions don't grow it forever in a long-running process.
+
+EMOTION_LABELS = ('anger', 'disgust', 'fear', 'joy', 'neutral', 'sadness', 'surprise')
+EMOTION_CODES = {label: code for code, label in enumerate(EMOTION_LABELS)}
+NEUTRAL_CODE = EMOTION_CODES['neutral']
+
+DEFAULT_DB_PATH = "emotiva_sessions.db"
+DEFAULT_RING_SIZE = 25
+DEFAULT_RETENTION_DAYS = 30
+PRUNE_INTERVAL = 3600
+
+
+def emotion_code(label):
+    return EMOTION_CODES.get(label, NEUTRAL_CODE)
+
+
+def pack_scores(result):
+    scores = array('f', bytes(4 * len(EMOTION_LABELS)))
+    for item in result or ():
+        code = EMOTION_CODES.get(item['label'].lower())
+        if code is not None:
+            scores[code] = item['score']
+    return scores
+
+
+# --------- Shared SQLite Helpers ---------
+# Used by SpillDB here and FleetRollup in mood_analytics, which share one file.
+def open_db(path):
+    # One connection per process, shared behind a lock; WAL lets readers run during writes
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class Retention:
+    # Calls expire(cutoff) to delete rows older than `days`; prune_if_due() is
+    # cheap enough for every write and really prunes at most once per `interval`
+    def __init__(self, days, expire, interval=PRUNE_INTERVAL):
+        self.days = days
+        self.expire = expire
+        self.interval = interval
+        self._next = 0.0
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        self._next = now + self.interval
+        if not self.days:
+            return 0
+        return self.expire(now - self.days * 86400)
+
+    def prune_if_due(self, now=None):
+        now = time.time() if now is None else now
+        return self.prune(now) if now >= self._next else 0
+
+
+class SpillDB:
+    def __init__(self, path=DEFAULT_DB_PATH, retention_days=DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_db(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS turns ("
+            " session_id TEXT NOT NULL,"
+            " turn INTEGER NOT NULL,"
+            " user_message TEXT NOT NULL,"
+            " reply TEXT NOT NULL,"
+            " lang TEXT NOT NULL,"
+            " emotion INTEGER NOT NULL,"
+            " scores BLOB NOT NULL,"
+            " spilled_at REAL NOT NULL,"
+            " PRIMARY KEY (session_id, turn)"
+            ") WITHOUT ROWID"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(turns)")]
+        if "spilled_at" not in columns:
+            # Files from before retention existed: their turns count as spilled now
+            self._conn.execute("ALTER TABLE turns ADD COLUMN spilled_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE turns SET spilled_at = ?", (time.time(),))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS turns_spilled_at ON turns (spilled_at)")
+        self.retention = Retention(retention_days, self._expire)
+        self.retention.prune()
+
+    def _expire(self, cutoff):
+        with self._lock:
+            return self._conn.execute("DELETE FROM turns WHERE spilled_at < ?", (cutoff,)).rowcount
+
+    def prune(self, now=None):
+        return self.retention.prune(now)
+
+    def write(self, session_id, turn):
+        number, user_message, reply, lang, code, scores = turn
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, number, user_message, reply, lang, code, scores.tobytes(), now),
+            )
+        self.retention.prune_if_due(now)
+
+    def read(self, session_id, start, stop):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT turn, user_message, reply, lang, emotion, scores FROM turns"
+                " WHERE session_id = ? AND turn >= ? AND turn < ? ORDER BY turn",
+                (session_id, start, stop),
+            ).fetchall()
+        return [(number, user, reply, lang, code, array('f', blob)) for number, user, reply, lang, code, blob in rows]
+
+    def delete(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MessageLog:
+    # Read-only, list-like view of a session's messages (two per turn) that
+    # ChatView can slice; only the requested slice is materialized.
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return 2 * self.store.turn_count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("MessageLog only supports slicing")
+        start, stop, _ = index.indices(len(self))
+        if start >= stop:
+            return []
+        in_memory = self.store._entries
+        offset = len(self) - len(in_memory)
+        if start >= offset:
+            # Recent window: rendered entries straight from memory
+            return list(in_memory)[start - offset:stop - offset]
+        entries = []
+        for turn in self.store.turns(start // 2, (stop + 1) // 2):
+            number, user_message, reply, lang = turn[:4]
+            entries.append((2 * number, make_entry("user", user_message)))
+            entries.append((2 * number + 1, make_entry("bot", reply, lang)))
+        return [entry for position, entry in entries if start <= position < stop]
+
+
+class SessionStore:
+    def __init__(self, session_id, db, ring_size=DEFAULT_RING_SIZE):
+        self.session_id = session_id
+        self.db = db
+        self.turn_count = 0
+        self.messages = MessageLog(self)
+        # Ring items: (turn, user_message, reply, lang, emotion_code, scores)
+        self._ring = deque(maxlen=ring_size)
+        self._entries = deque(maxlen=2 * ring_size)
+
+    def append_turn(self, user_message, reply, lang, emotion, scores=None):
+        if len(self._ring) == self._ring.maxlen:
+            self.db.write(self.session_id, self._ring[0])
+        turn = (self.turn_count, user_message, reply, lang, emotion_code(emotion), pack_scores(scores))
+        self._ring.append(turn)
+        self._entries.append(make_entry("user", user_message))
+        self._entries.append(make_entry("bot", reply, lang))
+        self.turn_count += 1
+
+    @property
+    def first_in_memory(self):
+        return self.turn_count - len(self._ring)
+
+    def turns(self, start, stop):
+        stop = min(stop, self.turn_count)
+        split = self.first_in_memory
+        older = self.db.read(self.session_id, start, min(stop, split)) if start < split else []
+        recent = [turn for turn in self._ring if max(start, split) <= turn[0] < stop]
+        return older + recent
+
+    def last_message(self):
+        if not self._ring:
+            return None
+        return self._ring[-1][2], self._ring[-1][3]
+
+    def clear(self):
+        self.db.delete(self.session_id)
+        self._ring.clear()
+        self._entries.clear()
+        self.turn_count = 0
@@ -0,0 +1,33 @@
+import json
+
+import batch_cli
+from bench import StubClassifier
+from translation import LocalTranslator
+
+# --------- Backfill Tests ---------
+
+
+class ShortOnlyTranslator(LocalTranslator):
+    # Rejects the whole batch when any text is long, like an over-limit API call
+    def translate_batch(self, texts, source='auto'):
+        if any(len(text) > 50 for text in texts):
+            raise ValueError("text too long")
+        return super().translate_batch(texts, source)
+
+
+def test_failed_translation_falls_back_to_original_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_cli, "load_classifier", lambda backend: StubClassifier())
+    monkeypatch.setattr(batch_cli, "load_translator", lambda name: ShortOnlyTranslator())
+    texts = ["hello", "नमस्ते", "नमस्ते " * 20, "मुझे मदद चाहिए", "ok", "thanks"]
+    source = tmp_path / "in.jsonl"
+    source.write_text("".join(json.dumps({"text": text}, ensure_ascii=False) + "\n" for text in texts), encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+
+    done, _ = batch_cli.run(batch_cli.parse_args([str(source), str(output), "--workers", "0", "--chunk-size", "2",
+                                                  "--translator", "local"]))
+
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert done == len(rows) == len(texts)
+    assert [row["translation_error"] is not None for row in rows] == [False, False, True, False, False, False]
+    assert rows[2]["translation"] == texts[2]
+    assert all(row["emotion"] for row in rows)
@@ -0,0 +1,28 @@
+import time
+
+from mood_analytics import FleetRollup
+
+# --------- Fleet Rollup Retention Tests ---------
+
+MONTH = 31 * 86400
+
+
+def test_fleet_rollup_prunes_old_events_but_keeps_totals(tmp_path):
+    rollup = FleetRollup(str(tmp_path / "sessions.db"), retention_days=30)
+    now = time.time()
+    rollup.record("a", "joy", ts=now - MONTH)
+    rollup.record("a", "anger", ts=now - MONTH)
+    rollup.record("b", "fear", ts=now)
+    count = lambda table: rollup._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    # Pruned at open, so records within the hour don't prune yet
+    assert count("mood_events") == 3
+
+    # Once the interval has passed, the next record() deletes the expired rows
+    rollup.retention._next = 0.0
+    rollup.record("b", "joy", ts=now)
+    assert count("mood_events") == 2
+    assert [counts for _, counts in rollup.recent(60, now=now)][0]['fear'] == 1
+    assert rollup._conn.execute("SELECT COUNT(*) FROM mood_minutes WHERE minute < ?",
+                                (int((now - 30 * 86400) // 60),)).fetchone()[0] == 0
+    assert rollup.totals()['turns'] == 4
+    rollup.close()
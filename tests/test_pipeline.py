@@ -0,0 +1,59 @@
+import threading
+import time
+
+from pipeline import chat_turn_pipeline
+
+# --------- Turn Pipeline Tests ---------
+# A slow emotion stage on a two-worker pool: timed-out calls must not pile up
+# behind each other, and the light stages must keep answering.
+
+TIMEOUTS = {'language': 0.1, 'translation': 0.1, 'emotion': 0.1, 'reply': 0.1}
+
+
+def test_saturated_pool_cancels_queued_stages_and_keeps_light_stages_fast():
+    calls = []
+    lock = threading.Lock()
+
+    def slow_emotion(text):
+        with lock:
+            calls.append(text)
+        time.sleep(0.5)
+        return 'joy', [], 'model'
+
+    pipeline = chat_turn_pipeline(
+        lambda text: 'English',
+        slow_emotion,
+        lambda text, emotion, language: f"{emotion}:{text}",
+        TIMEOUTS,
+        translate=lambda text, language: text,
+        max_workers=2,
+    )
+    try:
+        results = [pipeline.run(f"turn {i}", target_language='English') for i in range(10)]
+    finally:
+        pipeline.shutdown()
+
+    for result in results:
+        assert result['fallbacks'].get('emotion') == 'timeout'
+        assert 'language' not in result['fallbacks']
+        assert 'reply' not in result['fallbacks']
+        assert result['reply'] == f"neutral:{result['translation']}"
+    # Only calls that reached a free worker ran; the rest were cancelled while queued,
+    # so nothing abandoned starts after the last turn returns
+    started = len(calls)
+    time.sleep(0.6)
+    assert len(calls) == started < len(results)
+
+
+def test_stage_error_uses_fallback():
+    def broken(text):
+        raise ValueError(text)
+
+    pipeline = chat_turn_pipeline(lambda text: 'English', broken, lambda text, emotion, language: emotion, TIMEOUTS)
+    try:
+        result = pipeline.run("hello", target_language='English')
+    finally:
+        pipeline.shutdown()
+    assert result['emotion'] == ('neutral', [], 'fallback')
+    assert result['reply'] == 'neutral'
+    assert result['fallbacks'] == {'emotion': 'error: ValueError'}
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bench import LocalSynthesizer, StubClassifier
+from service import EmotivaService
+from service_client import EmotivaClient, ServiceError
+from translation import LocalTranslator, TranslationService
+from tts_cache import TTSCache
+
+# --------- Localhost Service Tests ---------
+# Runs service.py on an ephemeral port with a stub classifier and a local
+# synthesizer, and talks to it through the pooled EmotivaClient.
+
+IDLE_TIMEOUT = 0.2
+PHRASES = {"मुझे मदद चाहिए": "I need help", "mujhe bahut gussa aa raha hai": "I am very angry"}
+
+
+class CountingClassifier(StubClassifier):
+    # Slow enough that concurrent requests overlap; records every forwarded text
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.seen = []
+        self._lock = threading.Lock()
+
+    def __call__(self, inputs, **kwargs):
+        time.sleep(self.delay)
+        with self._lock:
+            self.seen.extend([inputs] if isinstance(inputs, str) else inputs)
+        return super().__call__(inputs, **kwargs)
+
+
+@pytest.fixture
+def server(tmp_path):
+    classifier = CountingClassifier()
+    service = EmotivaService(
+        classifier,
+        tts=TTSCache(LocalSynthesizer(), cache_dir=str(tmp_path)),
+        max_wait_ms=20,
+        idle_timeout=IDLE_TIMEOUT,
+        translation=TranslationService(LocalTranslator(PHRASES)),
+    )
+    accepted = []
+
+    async def handle(reader, writer):
+        accepted.append(writer.get_extra_info("peername"))
+        await service.handle(reader, writer)
+
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(asyncio.start_server(handle, "127.0.0.1", 0))
+    port = listener.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = EmotivaClient(f"http://127.0.0.1:{port}", timeout=5)
+
+    yield service, classifier, client, accepted
+
+    client.close()
+
+    async def shutdown():
+        listener.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+    service.batcher.close(5)
+    service.translation.close()
+
+
+def test_endpoints(server):
+    _, _, client, _ = server
+    scores = client.classify("I am really happy with the delivery")
+    assert {item['label'] for item in scores} == {'anger', 'disgust', 'fear', 'joy', 'neutral', 'sadness', 'surprise'}
+    assert client.language("नमस्ते, मेरा ऑर्डर कहाँ है?") == {"language": "हिन्दी", "code": "hi"}
+    assert client.reply("hi", "joy", "English").endswith("I'm here to help you with anything you need!")
+    assert client.tts("Hello there", "en").startswith(b"ID3")
+    assert client.health()["status"] == "ok"
+
+
+def test_batch_routes(server):
+    _, _, client, _ = server
+    texts = ["hi", "where is my order", "मुझे मदद चाहिए"]
+    assert len(client.classify_many(texts)) == 3
+    assert [result["code"] for result in client.languages(texts)] == ["en", "en", "hi"]
+    replies = client.replies([(text, "neutral", "English") for text in texts])
+    assert len(replies) == 3 and all(replies)
+    audio = client.tts_many([("Hello there", "en"), ("नमस्ते", "hi")])
+    assert len(audio) == 2 and all(clip.startswith(b"ID3") for clip in audio)
+
+
+@pytest.mark.parametrize("method, path, payload, status", [
+    ("POST", "/emotion", {"text": 5}, 400),
+    ("POST", "/emotion", ["not", "an", "object"], 400),
+    ("POST", "/emotion/batch", {"items": "hi"}, 400),
+    ("POST", "/reply", {"text": "hi", "language": "Klingon"}, 400),
+    ("POST", "/nowhere", {"text": "hi"}, 404),
+    ("GET", "/emotion", None, 405),
+])
+def test_errors(server, method, path, payload, status):
+    _, _, client, _ = server
+    with pytest.raises(ServiceError, match=f"failed with {status}"):
+        client._request(method, path, payload)
+    # The connection stays usable after an error response
+    assert client.health()["status"] == "ok"
+
+
+def test_non_english_text_is_classified_in_english(server):
+    _, classifier, client, _ = server
+    results = client._request("POST", "/emotion/batch", {"items": [{"text": text} for text in PHRASES]})["results"]
+    assert [result["translation"] for result in results] == list(PHRASES.values())
+    assert set(PHRASES.values()) <= set(classifier.seen)
+    assert not set(PHRASES) & set(classifier.seen)
+
+
+def test_concurrent_requests_are_coalesced(server):
+    service, classifier, client, _ = server
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        same = list(pool.map(client.classify, ["order status?"] * 8))
+    assert all(result == same[0] for result in same)
+    assert classifier.seen.count("order status?") == 1
+
+    texts = [f"message number {i}" for i in range(16)]
+    batches_before = service.batcher.stats()["batches"]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(client.classify, texts))
+    assert service.batcher.stats()["batches"] - batches_before < len(texts)
+
+
+def test_idle_keep_alive_connection_is_retried(server):
+    _, _, client, accepted = server
+    assert client.health()["status"] == "ok"
+    assert len(accepted) == 1
+    # The server drops the pooled socket while it sits idle
+    time.sleep(IDLE_TIMEOUT * 3)
+    assert client.health()["status"] == "ok"
+    assert len(accepted) == 2
+    # Back-to-back requests share the fresh connection
+    client.health()
+    assert len(accepted) == 2
@@ -0,0 +1,23 @@
+from session_store import SessionStore, SpillDB
+
+# --------- Spill-Over Retention Tests ---------
+
+MONTH = 31 * 86400
+
+
+def test_expired_turns_are_pruned_from_the_write_path(tmp_path):
+    db = SpillDB(str(tmp_path / "sessions.db"), retention_days=30)
+    store = SessionStore("old", db, ring_size=1)
+    for i in range(3):
+        store.append_turn(f"message {i}", "reply", "English", "joy", [])
+    db._conn.execute("UPDATE turns SET spilled_at = spilled_at - ?", (MONTH,))
+
+    # Pruned at open, so a write within the hour leaves the expired turns alone
+    store.append_turn("message 3", "reply", "English", "joy", [])
+    assert len(db.read("old", 0, 10)) == 3
+
+    # Once the interval has passed, the next write deletes them; turns 2 and 3 spilled recently
+    db.retention._next = 0.0
+    store.append_turn("message 4", "reply", "English", "joy", [])
+    assert [turn[0] for turn in db.read("old", 0, 10)] == [2, 3]
+    db.close()
@@ -0,0 +1,30 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from translation import LocalTranslator, TranslationService
+
+# --------- Translation Service Tests ---------
+
+
+class RecordingTranslator(LocalTranslator):
+    def __init__(self, phrases=None):
+        super().__init__(phrases)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts, source='auto'):
+        with self._lock:
+            self.calls.append((source, len(texts)))
+        return super().translate_batch(texts, source)
+
+
+def test_concurrent_misses_of_mixed_length_are_one_request():
+    translator = RecordingTranslator()
+    service = TranslationService(translator, max_wait_ms=50)
+    texts = ["नमस्ते " * n for n in (1, 5, 20, 40, 60, 90)]
+    try:
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            list(pool.map(lambda text: service.to_english(text, 'हिन्दी'), texts))
+    finally:
+        service.close()
+    assert translator.calls == [('hi', len(texts))]
@@ -0,0 +1,199 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from inference import MicroBatcher
+from language import DEFAULT_LANGUAGE, language_code
+
+# --------- Translators ---------
+# Duck-typed, there is no base class: anything with translate_batch(texts,
+# source) -> list of English strings can be used, so the pipeline runs against
+# LocalTranslator when there is no network. Every batch holds a single source
+# language.
+
+TRANSLATORS = ("google", "local")
+
+# Romanized Hindi has no code of its own; Google detects it per request
+SOURCE_CODES = {'Hinglish': 'auto'}
+
+
+def source_code(language):
+    return SOURCE_CODES.get(language) or language_code(language)
+
+
+class GoogleTranslatorBackend:
+    # Google accepts ~5000 characters per call, so messages are packed one per
+    # line into as few requests as possible instead of one request per message.
+    # A message over the limit is split at spaces, sent in pieces and rejoined.
+    MAX_CHARS = 4500
+
+    def __init__(self, target='en'):
+        self.target = target
+
+    def _split(self, text):
+        pieces = []
+        while len(text) > self.MAX_CHARS:
+            cut = text.rfind(" ", 0, self.MAX_CHARS + 1)
+            if cut <= 0:
+                cut = self.MAX_CHARS
+            pieces.append(text[:cut])
+            text = text[cut:].lstrip()
+        pieces.append(text)
+        return pieces
+
+    def _chunks(self, texts):
+        chunk, size = [], 0
+        for text in texts:
+            if chunk and size + len(text) + 1 > self.MAX_CHARS:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(text)
+            size += len(text) + 1
+        if chunk:
+            yield chunk
+
+    def translate_batch(self, texts, source='auto'):
+        from deep_translator import GoogleTranslator
+
+        translator = GoogleTranslator(source=source, target=self.target)
+        lines, spans = [], []
+        for text in texts:
+            pieces = self._split(" ".join(text.split()))
+            spans.append((len(lines), len(pieces)))
+            lines.extend(pieces)
+        results = []
+        for chunk in self._chunks(lines):
+            translated = translator.translate("\n".join(chunk)) or ""
+            parts = translated.split("\n")
+            if len(parts) != len(chunk):
+                # Line structure got lost, fall back to one call per message
+                parts = [translator.translate(text) or text for text in chunk]
+            results.extend(parts)
+        return [" ".join(results[start:start + count]) for start, count in spans]
+
+
+class LocalTranslator:
+    def __init__(self, phrases=None):
+        self.phrases = dict(phrases or {})
+
+    def translate_batch(self, texts, source='auto'):
+        return [self.phrases.get(text, text) for text in texts]
+
+
+def load_translator(name):
+    if name == "google":
+        return GoogleTranslatorBackend()
+    if name == "local":
+        return LocalTranslator()
+    raise ValueError(f"Unknown translator '{name}', expected one of {TRANSLATORS}")
+
+
+# --------- Cached, Coalesced Translation ---------
+# Results are cached by a hash of the source language and text. Misses from
+# every session go through one MicroBatcher per source language, which
+# coalesces concurrent calls into one bulk request in that language. Length
+# bucketing is off: it saves padding for the model but would split the batch
+# into one network round trip per bucket.
+
+class TranslationService:
+    def __init__(self, translator, max_entries=10000, max_batch_size=32, max_wait_ms=20):
+        self.translator = translator
+        self.max_entries = max_entries
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._batchers = {}
+
+    def _batcher(self, source):
+        batcher = self._batchers.get(source)
+        if batcher is None:
+            with self._lock:
+                batcher = self._batchers.get(source)
+                if batcher is None:
+                    def translate(texts, **kwargs):
+                        return self.translator.translate_batch(texts, source=source)
+
+                    batcher = self._batchers[source] = MicroBatcher(
+                        translate, max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait_ms, bucket_width=None,
+                        window_tokens=None,
+                    )
+        return batcher
+
+    @staticmethod
+    def _key(text, source):
+        return hashlib.sha1(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key):
+        with self._lock:
+            translated = self._cache.get(key)
+            if translated is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return translated
+
+    def _store(self, key, translated):
+        with self._lock:
+            self._cache[key] = translated
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def submit(self, text, source='auto'):
+        # Future of the English text; already resolved on a cache hit
+        result = Future()
+        key = self._key(text, source)
+        translated = self._lookup(key)
+        if translated is not None:
+            result.set_result(translated)
+            return result
+
+        def finished(done):
+            exc = done.exception()
+            if exc is not None:
+                result.set_exception(exc)
+                return
+            translated = done.result() or text
+            self._store(key, translated)
+            result.set_result(translated)
+
+        self._batcher(source).submit(text).add_done_callback(finished)
+        return result
+
+    def translate(self, text, source='auto', timeout=None):
+        return self.submit(text, source).result(timeout=timeout)
+
+    def translate_many(self, texts, source='auto', timeout=None):
+        futures = [self.submit(text, source) for text in texts]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def submit_english(self, text, language):
+        # language is a LANGUAGES name; only English goes to the classifier untouched
+        if language == DEFAULT_LANGUAGE:
+            result = Future()
+            result.set_result(text)
+            return result
+        return self.submit(text, source_code(language))
+
+    def to_english(self, text, language, timeout=None):
+        return self.submit_english(text, language).result(timeout=timeout)
+
+    def close(self):
+        for batcher in list(self._batchers.values()):
+            batcher.close()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "batchers": {source: batcher.stats() for source, batcher in self._batchers.items()},
+            }
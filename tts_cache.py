@@ -0,0 +1,218 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+# --------- Synthesizers ---------
+# Duck-typed like the classifier: anything with a synthesize(text, lang) -> mp3
+# bytes method can back the cache, which keeps gTTS (network) swappable for a
+# local fake.
+
+class GTTSSynthesizer:
+    def synthesize(self, text, lang):
+        from gtts import gTTS
+
+        buffer = BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+# --------- Content-Addressed Audio Cache ---------
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+# gTTS serves constant-bitrate 32 kbps mono mp3, which lets us estimate clip length
+GTTS_BITRATE = 32000
+STREAM_WORKERS = 4
+
+# Sentence ends: Latin punctuation and the Devanagari danda, followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+MIN_SEGMENT_CHARS = 12
+
+
+def split_sentences(text):
+    segments = []
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        # Very short fragments ("Hi!") are folded into the next sentence
+        if segments and len(segments[-1]) < MIN_SEGMENT_CHARS:
+            segments[-1] = f"{segments[-1]} {part}"
+        else:
+            segments.append(part)
+    return segments
+
+
+def estimate_duration(audio):
+    return len(audio) * 8.0 / GTTS_BITRATE
+
+
+def cache_key(text, lang):
+    return hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(self, synthesizer=None, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.synthesizer = synthesizer or GTTSSynthesizer()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._size = 0
+        self._inflight = {}
+        self._pool = None
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _load_index(self):
+        # Rebuild LRU order from file mtimes, which get() refreshes on every hit
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            found.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _store(self, key, data):
+        path = self._path(key)
+        partial = f"{path}.{threading.get_ident()}.part"
+        with open(partial, "wb") as fh:
+            fh.write(data)
+        os.replace(partial, path)
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def get(self, text, lang):
+        key = cache_key(text, lang)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                cached = True
+            else:
+                cached = False
+                future = self._inflight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._inflight[key] = Future()
+
+        if cached:
+            data = self._read(key)
+            if data is not None:
+                with self._lock:
+                    self.hits += 1
+                return data
+            # File vanished underneath us, drop the entry and synthesize again
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+            return self.get(text, lang)
+
+        if not owner:
+            # Another session is already synthesizing the same clip
+            return future.result()
+
+        try:
+            data = self.synthesizer.synthesize(text, lang)
+            self._store(key, data)
+            with self._lock:
+                self.misses += 1
+            future.set_result(data)
+            return data
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # --------- Sentence Streaming ---------
+    # A reply is cut at sentence boundaries and every sentence is cached on its
+    # own, so shared pieces (the empathy prefixes) are synthesized only once.
+    # Segments are synthesized concurrently but yielded in order, first one first.
+    def submit_segments(self, text, lang):
+        # One future per segment, in reply order
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix="emotiva-tts")
+        return [self._pool.submit(self.get, segment, lang) for segment in split_sentences(text) or [text]]
+
+    def stream(self, text, lang):
+        segments = split_sentences(text)
+        if len(segments) <= 1:
+            yield self.get(text, lang)
+            return
+        for future in self.submit_segments(text, lang):
+            yield future.result()
+
+    def get_segmented(self, text, lang):
+        # MP3 frames concatenate cleanly, so the joined segments play as one clip
+        return b"".join(self.stream(text, lang))
+
+    def prewarm(self, pairs, workers=4, split=False):
+        if split:
+            pairs = [(segment, lang) for text, lang in pairs for segment in split_sentences(text) or [text]]
+        pairs = list(dict.fromkeys(pairs))
+        failed = []
+
+        def warm(pair):
+            try:
+                self.get(*pair)
+            except Exception:
+                failed.append(pair)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(warm, pairs))
+        return len(pairs) - len(failed), failed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+from backends import DEFAULT_BACKEND, load_classifier
+
+# --------- Startup Profiling ---------
+class StartupProfile:
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+        self._last = self.started
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        # Time since the previous mark; only the first script run is profiled
+        with self._lock:
+            if self.finished:
+                return
+            now = time.perf_counter()
+            self.phases.append((phase, (now - self._last) * 1000.0))
+            self._last = now
+
+    def record(self, phase, elapsed_ms):
+        # Phases measured on another thread (model loading) are recorded as-is
+        with self._lock:
+            self.phases.append((phase, elapsed_ms))
+
+    def finish(self, phase="first render"):
+        if self.finished:
+            return
+        self.mark(phase)
+        self.finished = True
+        print(f"Emotiva startup: {self.report()}")
+
+    def report(self):
+        with self._lock:
+            return ", ".join(f"{phase}={elapsed:.0f}ms" for phase, elapsed in self.phases)
+
+
+# --------- Background Model Warm-Up ---------
+# Loads the classifier on a daemon thread so the page can render right away.
+# Until the model is ready, calls raise ModelNotReady at once, so callers fall
+# back straight away instead of parking a worker thread on the load, and
+# `status` lets the UI show a "warming up" state instead of a blank page.
+
+WARMUP_TEXT = "Hello, I just wanted to check on my order."
+
+
+class ModelNotReady(RuntimeError):
+    pass
+
+
+class ModelWarmup:
+    def __init__(self, backend=DEFAULT_BACKEND, threads=None, profile=None):
+        self.backend = backend
+        self.threads = threads or int(os.environ.get("EMOTIVA_TORCH_THREADS", 0)) or None
+        self.profile = profile or StartupProfile()
+        self.status = "pending"
+        self.error = None
+        self.classifier = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="emotiva-warmup", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _phase(self, name, func):
+        started = time.perf_counter()
+        value = func()
+        self.profile.record(name, (time.perf_counter() - started) * 1000.0)
+        return value
+
+    def _configure_torch(self):
+        import torch
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        return torch
+
+    def _run(self):
+        try:
+            self.status = "loading"
+            self._phase("import torch", self._configure_torch)
+            classifier = self._phase("load model", lambda: load_classifier(self.backend))
+            self.status = "warming"
+            # One forward pass so the first real message doesn't pay for lazy initialization
+            self._phase("warm-up pass", lambda: classifier([WARMUP_TEXT], truncation=True))
+            self.classifier = classifier
+            self.status = "ready"
+            print(f"Emotiva model ready: {self.profile.report()}")
+        except Exception as exc:
+            self.error = exc
+            self.status = "failed"
+        finally:
+            self._ready.set()
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    @property
+    def tokenizer(self):
+        return getattr(self.classifier, "tokenizer", None)
+
+    def wait(self, timeout=None):
+        self._ready.wait(timeout)
+        return self.ready
+
+    def __call__(self, *args, **kwargs):
+        if self.status == "failed":
+            raise RuntimeError(f"Model failed to load: {self.error}")
+        if self.status != "ready":
+            raise ModelNotReady(f"Model is {self.status}")
+        return self.classifier(*args, **kwargs)